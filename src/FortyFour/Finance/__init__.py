@@ -1,14 +1,77 @@
-from .company import Company, GAAP
-from .utils import SECCache, calculate_cagr, request_company_filing
-from .engine import MetricEngine, MetricRegistry
+import importlib
 
+# Public name -> submodule defining it. Submodules are imported on first access, so
+# ``from FortyFour.Finance import SECCache`` does not pay for pandas, plotly or httpx.
+_LAZY_EXPORTS = {
+    "Company": "company",
+    "GAAP": "company",
+    "Instrumentation": "instrumentation",
+    "MetricEngine": "engine",
+    "MetricRegistry": "engine",
+    "OpenTelemetryListener": "instrumentation",
+    "Quarterly": "periods",
+    "RefreshPlanner": "refresh",
+    "SECCache": "utils",
+    "TTM": "periods",
+    "TokenBucket": "fetcher",
+    "calculate_cagr": "utils",
+    "cross_sectional_cagr": "utils",
+    "extract_facts": "utils",
+    "fetch_company_filings": "fetcher",
+    "fetch_logo_urls": "fetcher",
+    "normalize_cik": "utils",
+    "parse_form_index": "refresh",
+    "refresh_tickers": "utils",
+    "request_company_filing": "utils",
+    "render_sparkline": "utils",
+    "render_sparklines": "utils",
+    "resolve_ticker": "utils",
+    "rolling_cagr": "utils",
+    "telemetry": "instrumentation",
+}
 
 __all__ = [
     "Company",
     "GAAP",
+    "Instrumentation",
     "MetricEngine",
     "MetricRegistry",
+    "OpenTelemetryListener",
+    "Quarterly",
+    "RefreshPlanner",
     "SECCache",
+    "TTM",
+    "TokenBucket",
     "calculate_cagr",
+    "cross_sectional_cagr",
+    "extract_facts",
+    "fetch_company_filings",
+    "fetch_logo_urls",
+    "normalize_cik",
+    "parse_form_index",
+    "refresh_tickers",
     "request_company_filing",
+    "render_sparkline",
+    "render_sparklines",
+    "resolve_ticker",
+    "rolling_cagr",
+    "telemetry",
 ]
+
+
+def __getattr__(name: str):
+    """
+    Import the submodule defining ``name`` on first access and bind its exports to the package.
+    """
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    for export, owner in _LAZY_EXPORTS.items():
+        if owner == module_name:
+            globals()[export] = getattr(module, export)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
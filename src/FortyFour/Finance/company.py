@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 import logging
+from collections import OrderedDict
 from enum import Enum
-from FortyFour.Finance.utils import request_company_filing, SECCache
+from FortyFour.Finance.periods import PERIOD_FORMS, quarterly_values, trailing_twelve_months
+from FortyFour.Finance.utils import normalize_cik, request_company_filing, resolve_ticker, SECCache
 
 
 class GAAP(Enum):
@@ -118,18 +121,44 @@ class GAAP(Enum):
     ])
 
 
+# Per-entry companyfacts fields kept in Company.facts_frame
+_FRAME_ENTRY_FIELDS = ["form", "fy", "fp", "start", "end", "filed", "accn", "frame", "val"]
+
+# Derived period bases served by Company.get_period_fact
+_PERIOD_BUILDERS = {"quarterly": quarterly_values, "ttm": trailing_twelve_months}
+
+
 class Company:
     """
     A class representing a company with its CIK and name.
+
+    Series returned by ``get_raw_fact`` are memoized per (tag, filings_type)
+    in an LRU of at most ``fact_cache_size`` entries, cleared whenever the
+    filing data is refreshed or replaced.
     """
-    def __init__(self, cik: str, name: str, cache: SECCache = None):
+    def __init__(self, cik: str, name: str, cache: SECCache = None, fact_cache_size: int = 128):
         # Ensure CIK is correctly formatted (10 digits, optionally prefixed with CIK)
-        self.cik = str(cik).zfill(10)
-        if not self.cik.startswith("CIK"):
-            self.cik = f"CIK{self.cik}"
+        self.cik = normalize_cik(cik)
         self.name = name
         self.cache = cache
         self._filing_data = None
+        self._tag_index = None
+        self._facts_frame = None
+        self._frame_groups = None
+        self.fact_cache_size = fact_cache_size
+        self._fact_cache = OrderedDict()
+
+    @classmethod
+    def from_ticker(cls, ticker: str, cache: SECCache = None, **kwargs) -> "Company":
+        """
+        Create a Company from its ticker symbol (e.g. ``"AAPL"``), resolved through the SEC ticker list.
+
+        With a cache the ticker list is stored in its database (see ``resolve_ticker``).
+        """
+        record = resolve_ticker(ticker, cache=cache)
+        if record is None:
+            raise ValueError(f"Unknown ticker {ticker!r}")
+        return cls(cik=record["cik"], name=record["name"], cache=cache, **kwargs)
 
     @property
     def filing_data(self):
@@ -140,33 +169,161 @@ class Company:
             self._filing_data = request_company_filing(self.cik, cache=self.cache)
             if not self._filing_data:
                 logging.error(f"Failed to fetch filing data for CIK {self.cik}")
+            self._tag_index = self._build_tag_index(self._filing_data)
         return self._filing_data
 
+    @filing_data.setter
+    def filing_data(self, data: dict):
+        self._filing_data = data
+        self._tag_index = self._build_tag_index(data) if data is not None else None
+        self._facts_frame = None
+        self._frame_groups = None
+        self._fact_cache.clear()
+
+    def refresh(self):
+        """
+        Drop the loaded filing data and every derived cache; the next access reloads from cache or API.
+        """
+        self.filing_data = None
+
+    @property
+    def tag_index(self) -> dict:
+        """
+        Mapping of tag -> list of (taxonomy, unit, entries), built once when the filing data loads.
+        """
+        if self._tag_index is None:
+            self.filing_data
+        return self._tag_index
+
+    @staticmethod
+    def _build_tag_index(data: dict) -> dict:
+        index = {}
+        facts = data.get("facts", {}) if data else {}
+        # Index across all fact types (us-gaap, dei, etc.)
+        for taxonomy, fact_type_data in facts.items():
+            if not isinstance(fact_type_data, dict):
+                continue
+            for tag, tag_data in fact_type_data.items():
+                for unit, entries in tag_data.get("units", {}).items():
+                    index.setdefault(tag, []).append((taxonomy, unit, entries))
+        return index
+
+    def facts_frame(self) -> pd.DataFrame:
+        """
+        All of the company's facts flattened into one columnar DataFrame, built once.
+
+        Columns: taxonomy, tag, unit, form, fy, fp, start, end, filed, accn,
+        frame, val and ``latest`` (True for the most recently filed value of
+        each tag/form/end). Labels are categorical and dates are parsed in a
+        single vectorized pass. Rows are sorted by tag, form, end and filed
+        (latest first). Treat the frame as read-only: ``get_raw_fact`` slices it.
+        """
+        if self._facts_frame is None:
+            frame = self._build_facts_frame(self.tag_index)
+            self._facts_frame = frame
+            self._frame_groups = frame.groupby(["tag", "form"], observed=True, sort=False).indices
+        return self._facts_frame
+
+    @staticmethod
+    def _build_facts_frame(tag_index: dict) -> pd.DataFrame:
+        entries, lengths, labels = [], [], {"taxonomy": [], "tag": [], "unit": []}
+        for tag, groups in tag_index.items():
+            for taxonomy, unit, tag_entries in groups:
+                entries.extend(tag_entries)
+                lengths.append(len(tag_entries))
+                labels["taxonomy"].append(taxonomy)
+                labels["tag"].append(tag)
+                labels["unit"].append(unit)
+
+        frame = pd.DataFrame.from_records(entries, columns=_FRAME_ENTRY_FIELDS)
+        for position, (column, values) in enumerate(labels.items()):
+            frame.insert(position, column, pd.Categorical(np.repeat(np.array(values, dtype=object), lengths)))
+        for column in ("form", "fp"):
+            frame[column] = frame[column].astype("category")
+        for column in ("start", "end", "filed"):
+            frame[column] = pd.to_datetime(frame[column], format="%Y-%m-%d", errors="coerce")
+
+        # Restatements: keep track of the latest filed value for each tag/form/end
+        frame = frame.sort_values(
+            by=["tag", "form", "end", "filed"], ascending=[True, True, True, False], kind="stable"
+        ).reset_index(drop=True)
+        frame["latest"] = ~frame.duplicated(subset=["tag", "form", "end"], keep="first")
+        return frame
+
     def get_raw_fact(self, tag_name: str, filings_type: str = "10-K") -> pd.Series:
         """
         Retrieve a specific XBRL tag from the filing data as a time-series.
         """
-        data = self.filing_data
-        if not data or "facts" not in data:
+        return self._memoized((tag_name, filings_type), lambda: self._load_raw_fact(tag_name, filings_type))
+
+    def get_quarterly_fact(self, tag_name: str) -> pd.Series:
+        """
+        Discrete fiscal-quarter values of a tag, derived from 10-K and 10-Q facts (Q4 = FY - 9M YTD).
+        """
+        return self.get_period_fact(tag_name, "quarterly")
+
+    def get_ttm_fact(self, tag_name: str) -> pd.Series:
+        """
+        Trailing-twelve-month values of a tag (the latest balance for instant facts).
+        """
+        return self.get_period_fact(tag_name, "ttm")
+
+    def get_period_fact(self, tag_name: str, basis: str) -> pd.Series:
+        """
+        Retrieve a tag on a derived period basis: "quarterly" or "ttm".
+        """
+        if basis not in _PERIOD_BUILDERS:
+            raise ValueError(f"Unknown period basis {basis!r}, expected one of {list(_PERIOD_BUILDERS)}")
+        return self._memoized(("period", tag_name, basis), lambda: _PERIOD_BUILDERS[basis](self._period_rows(tag_name)))
+
+    def _period_rows(self, tag_name: str) -> pd.DataFrame:
+        frame = self.facts_frame()
+        positions = [self._frame_groups[(tag_name, form)] for form in PERIOD_FORMS if (tag_name, form) in self._frame_groups]
+        if not positions:
+            return frame.iloc[0:0]
+        return frame.iloc[np.concatenate(positions)]
+
+    def _memoized(self, key, loader) -> pd.Series:
+        if key in self._fact_cache:
+            self._fact_cache.move_to_end(key)
+            return self._fact_cache[key].copy()
+
+        series = loader()
+        if self.fact_cache_size > 0:
+            self._fact_cache[key] = series
+            if len(self._fact_cache) > self.fact_cache_size:
+                self._fact_cache.popitem(last=False)
+        return series.copy()
+
+    def _load_raw_fact(self, tag_name: str, filings_type: str) -> pd.Series:
+        # A normalized cache can answer a single tag without loading the full document
+        if self._filing_data is None and self.cache is not None and self.cache.normalized:
+            entries = self.cache.get_fact_entries(self.cik, tag_name, filings_type)
+            if entries is not None:
+                return self._entries_to_series(entries)
+
+        frame = self.facts_frame()
+        positions = self._frame_groups.get((tag_name, filings_type))
+        if positions is None:
             return pd.Series(dtype=float)
-            
-        collected = []
-        # Search across all fact types (us-gaap, dei, etc.)
-        facts = data.get("facts", {})
-        for fact_type_data in facts.values():
-            if not isinstance(fact_type_data, dict):
-                continue
-            if tag_name in fact_type_data:
-                units = fact_type_data[tag_name].get("units", {})
-                for entries in units.values():
-                    for entry in entries:
-                        if entry.get("form") == filings_type:
-                            collected.append(entry)
-        
-        if not collected:
+        rows = frame.iloc[positions]
+        values = rows["val"].to_numpy()
+        if values.dtype.kind == "f" and np.isfinite(values).all() and (values == np.trunc(values)).all():
+            # The shared val column is float as soon as any tag has decimals: give whole-number tags
+            # back their integer dtype, as the per-tag normalized path does
+            values = values.astype(np.int64)
+        latest = rows["latest"].to_numpy()
+        return pd.Series(values[latest], index=pd.DatetimeIndex(rows["end"][latest], name="Date"), name="val")
+
+    @staticmethod
+    def _entries_to_series(entries: list) -> pd.Series:
+        """
+        Turn raw companyfacts entries into a Date-indexed Series, keeping the latest filing per end date.
+        """
+        if not entries:
             return pd.Series(dtype=float)
             
-        df = pd.DataFrame(collected)
+        df = pd.DataFrame(entries)
         df["end"] = pd.to_datetime(df["end"], format="%Y-%m-%d", errors='coerce')
         # Sort by end date, then by filed date (latest first) to handle restatements
         df = df.sort_values(by=["end", "filed"], ascending=[True, False])
@@ -1,5 +1,26 @@
 import pandas as pd
+import asyncio
+import functools
+import hashlib
+import json
 import logging
+import multiprocessing
+import os
+import sys
+import sysconfig
+import types
+from graphlib import CycleError, TopologicalSorter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from FortyFour.Finance.company import Company
+from FortyFour.Finance.instrumentation import telemetry
+from FortyFour.Finance.periods import PeriodComponent
+
+# Columns of the tidy frame returned by MetricEngine.calculate_many
+RESULT_COLUMNS = ["cik", "metric", "date", "value"]
+
+# Engine and cache inherited by calculate_many worker processes
+_worker_state = {}
 
 class MetricRegistry:
     """
@@ -7,6 +28,8 @@ class MetricRegistry:
     """
     def __init__(self):
         self.metrics = {}
+        # Metrics already reported as having no stable fingerprint
+        self._unfingerprinted = set()
 
     def register(self, name, components, formula):
         """
@@ -14,35 +37,173 @@ class MetricRegistry:
         
         Args:
             name (str): The name of the metric.
-            components (dict): Mapping of argument names to lists of SEC synonyms.
+            components (dict): Mapping of argument names to either a list of SEC synonyms
+                (optionally wrapped in ``TTM``/``Quarterly`` to use derived periods)
+                or the name (str) of another registered metric to reuse.
             formula (callable): A function that takes components as arguments and returns a result.
         """
         self.metrics[name] = {"components": components, "formula": formula}
 
+    def dependencies(self, name) -> list:
+        """
+        Names of the registered metrics directly referenced by a metric's components.
+        """
+        return [spec for spec in self.metrics[name]["components"].values() if isinstance(spec, str)]
+
+    def evaluation_order(self, names) -> list:
+        """
+        Topologically sort the given metrics and everything they depend on (dependencies first).
+
+        Raises:
+            ValueError: If a metric is unknown or the dependency graph has a cycle.
+        """
+        graph = {}
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in graph:
+                continue
+            if name not in self.metrics:
+                raise ValueError(f"Metric {name} not found in registry.")
+            graph[name] = self.dependencies(name)
+            pending.extend(graph[name])
+        try:
+            return list(TopologicalSorter(graph).static_order())
+        except CycleError as e:
+            raise ValueError(f"Circular metric dependencies: {' -> '.join(e.args[1])}") from e
+
+    def fingerprint(self, name) -> str:
+        """
+        Hash of a metric's definition: its components, formula and dependencies' fingerprints.
+
+        The formula is hashed through its bytecode, default arguments, closure
+        values and the globals it references (helper functions recursively).
+        Any change to the recipe (or to a metric it depends on) changes the
+        fingerprint, which invalidates persisted results.
+
+        Returns ``None`` when a formula captures a value that cannot be hashed
+        stably (e.g. a DataFrame or an arbitrary object): such metrics are
+        never served from persisted results.
+        """
+        fingerprints = {}
+        for metric_name in self.evaluation_order([name]):
+            recipe = self.metrics[metric_name]
+            digest = hashlib.sha256()
+            digest.update(metric_name.encode())
+            try:
+                for arg_name, spec in sorted(recipe["components"].items()):
+                    if isinstance(spec, str):
+                        if fingerprints[spec] is None:
+                            raise _UnstableFingerprint(spec)
+                        dependency = fingerprints[spec]
+                    else:
+                        dependency = repr(spec)
+                    digest.update(f"{arg_name}={dependency};".encode())
+                digest.update(_callable_fingerprint(recipe["formula"]))
+            except _UnstableFingerprint as e:
+                fingerprints[metric_name] = None
+                if metric_name not in self._unfingerprinted:
+                    self._unfingerprinted.add(metric_name)
+                    logging.warning(
+                        f"Metric {metric_name} depends on a value without a stable fingerprint ({e}): "
+                        "its results will not be persisted"
+                    )
+                continue
+            fingerprints[metric_name] = digest.hexdigest()
+        return fingerprints[name]
+
 class MetricEngine:
     """
     An engine for calculating metrics registered in a MetricRegistry.
+
+    Metrics may reference other metrics: the engine evaluates the dependency
+    DAG in topological order and computes each shared node (and each synonym
+    list) once per company, using the ``memo`` dict shared across calls.
+
+    With ``cache_results=True``, results are persisted in the company's
+    ``SECCache`` keyed by (cik, metric, formula fingerprint, source version)
+    and served from there while neither the recipe nor the company's cached
+    filing data has changed.
     """
-    def __init__(self, registry: MetricRegistry):
+    def __init__(self, registry: MetricRegistry, cache_results: bool = False):
         self.registry = registry
+        self.cache_results = cache_results
 
-    def calculate(self, company, metric_name, filings_type="10-K") -> pd.Series:
+    def calculate(self, company, metric_name, filings_type="10-K", memo=None) -> pd.Series:
         """
         Calculate a metric for a given company.
+
+        Pass the same ``memo`` dict to successive calls for one company to
+        reuse the metrics and components they share.
         """
         if metric_name not in self.registry.metrics:
             raise ValueError(f"Metric {metric_name} not found in registry.")
-            
-        recipe = self.registry.metrics[metric_name]
-        data_components = {}
-        
-        # Fetch each component using synonyms
-        for arg_name, synonyms in recipe["components"].items():
+
+        store = company.cache if self.cache_results else None
+        fingerprint = self.registry.fingerprint(metric_name) if store is not None else None
+        if fingerprint is None:
+            store = None
+        if store is not None:
+            source_version = store.source_version(company.cik)
+            if source_version is not None:
+                payload = store.get_metric_result(company.cik, metric_name, filings_type, fingerprint, source_version)
+                if payload is not None:
+                    telemetry.increment("metric_cache.hit", metric=metric_name)
+                    return _deserialize_series(payload)
+            telemetry.increment("metric_cache.miss", metric=metric_name)
+
+        memo = {} if memo is None else memo
+        for name in self.registry.evaluation_order([metric_name]):
+            if (name, filings_type) not in memo:
+                with telemetry.timer("metric.compute", metric=name):
+                    memo[(name, filings_type)] = self._evaluate(company, name, filings_type, memo)
+        result = memo[(metric_name, filings_type)]
+
+        if store is not None and isinstance(result, pd.Series):
+            # Read the version again: computing may have refreshed the company's payload
+            source_version = store.source_version(company.cik)
+            if source_version is not None:
+                store.store_metric_result(
+                    company.cik, metric_name, filings_type, fingerprint, source_version, _serialize_series(result)
+                )
+        return result
+
+    def _resolve_component(self, company, synonyms, filings_type, memo) -> pd.Series:
+        """
+        Return the first synonym with data, resolving each synonym list once per memo.
+
+        ``TTM``/``Quarterly`` components are resolved on their derived period
+        basis, whatever the filings type.
+        """
+        basis = synonyms.basis if isinstance(synonyms, PeriodComponent) else None
+        key = ("component", basis, tuple(synonyms), filings_type)
+        if key not in memo:
             found_data = pd.Series(dtype=float)
             for tag in synonyms:
-                found_data = company.get_raw_fact(tag, filings_type=filings_type)
+                if basis:
+                    found_data = company.get_period_fact(tag, basis)
+                else:
+                    found_data = company.get_raw_fact(tag, filings_type=filings_type)
                 if not found_data.empty:
                     break
+            memo[key] = found_data
+        return memo[key]
+
+    def _evaluate(self, company, metric_name, filings_type, memo) -> pd.Series:
+        """
+        Evaluate one metric whose metric dependencies are already in ``memo``.
+        """
+        recipe = self.registry.metrics[metric_name]
+        data_components = {}
+        
+        # Fetch each component using synonyms, or reuse an already computed metric
+        for arg_name, spec in recipe["components"].items():
+            if isinstance(spec, str):
+                found_data = memo[(spec, filings_type)]
+                if not isinstance(found_data, pd.Series):
+                    found_data = pd.Series(dtype=float)
+            else:
+                found_data = self._resolve_component(company, spec, filings_type, memo)
             
             if found_data.empty:
                 logging.warning(f"Required component '{arg_name}' not found for {company.name}")
@@ -65,3 +226,336 @@ class MetricEngine:
         except Exception as e:
             logging.error(f"Error calculating {metric_name} for {company.name}: {e}")
             return pd.Series(dtype=float)
+
+    def calculate_panel(self, companies, metric_name, filings_type="10-K") -> pd.DataFrame:
+        """
+        Calculate a metric for many companies at once, as a wide (Date x cik) DataFrame.
+
+        Each component is stacked into a wide frame with one column per
+        company and the formula is applied once to the whole panel, so the
+        arithmetic is vectorized across companies. Dates are aligned like in
+        ``calculate`` (forward-filled per company, then restricted to the
+        dates where the company reported at least one component). Companies
+        missing a component get an all-NaN column. Formulas that cannot
+        operate on DataFrames fall back to the per-company path.
+        """
+        companies = list(companies)
+        ciks = [co.cik for co in companies]
+        memos = {co.cik: {} for co in companies}
+        panels = {}
+        for name in self.registry.evaluation_order([metric_name]):
+            with telemetry.timer("metric.compute", metric=name, panel=True):
+                panels[name] = self._evaluate_panel(companies, name, filings_type, memos, panels)
+        return panels[metric_name].reindex(columns=pd.Index(ciks, name="cik"))
+
+    def _evaluate_panel(self, companies, metric_name, filings_type, memos, panels) -> pd.DataFrame:
+        """
+        Evaluate one metric over the panel whose metric dependencies are already in ``panels``.
+        """
+        recipe = self.registry.metrics[metric_name]
+        components = {}
+        for arg_name, spec in recipe["components"].items():
+            if isinstance(spec, str):
+                wide = panels[spec]
+                components[arg_name] = {cik: wide[cik].dropna() for cik in wide.columns if wide[cik].notna().any()}
+            else:
+                resolved = {co.cik: self._resolve_component(co, spec, filings_type, memos[co.cik]) for co in companies}
+                components[arg_name] = {cik: series for cik, series in resolved.items() if not series.empty}
+
+        # Companies missing any component produce no result, like calculate()
+        valid = [co.cik for co in companies if all(co.cik in found for found in components.values())]
+        for co in companies:
+            if co.cik not in valid:
+                logging.warning(f"Required component missing for {metric_name} for {co.name}")
+        if not valid:
+            return pd.DataFrame(columns=pd.Index([], name="cik"), dtype=float)
+
+        wide = {
+            arg_name: pd.DataFrame({cik: found[cik] for cik in valid}).sort_index()
+            for arg_name, found in components.items()
+        }
+        index = wide[next(iter(wide))].index
+        for frame in wide.values():
+            index = index.union(frame.index)
+        wide = {arg_name: frame.reindex(index) for arg_name, frame in wide.items()}
+        # Dates each company actually reported, before forward-filling across the union of dates
+        observed = None
+        for frame in wide.values():
+            observed = frame.notna() if observed is None else observed | frame.notna()
+        wide = {arg_name: frame.ffill() for arg_name, frame in wide.items()}
+
+        try:
+            result = recipe["formula"](**wide)
+            if not isinstance(result, pd.DataFrame):
+                raise TypeError(f"formula returned {type(result).__name__}, not a DataFrame")
+        except Exception as e:
+            logging.info(f"Falling back to per-company evaluation of {metric_name}: {e}")
+            by_cik = {co.cik: co for co in companies}
+            result = pd.DataFrame({
+                cik: self.calculate(by_cik[cik], metric_name, filings_type=filings_type, memo=memos[cik])
+                for cik in valid
+            })
+            return result.rename_axis(index="Date", columns="cik")
+
+        result = result.where(observed.reindex(index=result.index, columns=result.columns, fill_value=False))
+        return result.rename_axis(index="Date", columns="cik")
+
+    def calculate_many(self, companies, metric_names, workers=None, filings_type="10-K", cache=None) -> pd.DataFrame:
+        """
+        Calculate several metrics across a universe of companies.
+
+        Args:
+            companies (iterable): ``Company`` instances or CIKs.
+            metric_names (iterable): Names of registered metrics.
+            workers (int): Number of worker processes. ``None``/``1`` runs in-process, as
+                do platforms without the ``fork`` start method.
+            filings_type (str): Form type passed to every calculation.
+            cache (SECCache): Cache shared by the workers, defaulting to the first company's cache.
+
+        Returns:
+            A long-format DataFrame with columns cik, metric, date, value.
+
+        Workers are forked so registered formulas (often lambdas) do not need
+        to be picklable; each worker re-opens its own SQLite connections to
+        the shared cache. Only (cik, name) pairs cross process boundaries.
+
+        Before forking, the filings missing from the cache are downloaded in
+        this process with ``fetch_company_filings``, whose token bucket keeps
+        the whole run within SEC's rate limit. Workers only read: a company
+        whose download failed is computed from empty filing data.
+        """
+        metric_names = list(metric_names)
+        # Fail fast on unknown metrics and dependency cycles before spawning any worker
+        self.registry.evaluation_order(metric_names)
+
+        companies = list(companies)
+        if cache is None:
+            cache = next((co.cache for co in companies if isinstance(co, Company) and co.cache is not None), None)
+        companies = [co if isinstance(co, Company) else Company(cik=co, name=str(co), cache=cache) for co in companies]
+
+        parallel = bool(workers) and workers > 1 and len(companies) > 1
+        if parallel and "fork" not in multiprocessing.get_all_start_methods():
+            # Spawned workers would have to pickle the registry's formulas, which are often lambdas
+            logging.warning("The fork start method is unavailable: calculating metrics in-process")
+            parallel = False
+        if not parallel:
+            frames = [self._calculate_company(co, metric_names, filings_type) for co in companies]
+        else:
+            filings = _prefetch_filings([co.cik for co in companies], cache)
+            tasks = [(co.cik, co.name, metric_names, filings_type) for co in companies]
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker, initargs=(self, cache, filings)
+            ) as executor:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                frames = list(executor.map(_calculate_in_worker, tasks, chunksize=chunksize))
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def _calculate_company(self, company, metric_names, filings_type) -> pd.DataFrame:
+        """
+        Calculate every metric for one company as a tidy frame.
+        """
+        frames = []
+        memo = {}
+        for metric_name in metric_names:
+            result = self.calculate(company, metric_name, filings_type=filings_type, memo=memo)
+            if not isinstance(result, pd.Series):
+                logging.warning(f"Metric {metric_name} did not return a Series for {company.name}")
+                continue
+            result = result.dropna()
+            if result.empty:
+                continue
+            frames.append(pd.DataFrame({
+                "cik": company.cik,
+                "metric": metric_name,
+                "date": result.index,
+                "value": result.to_numpy(),
+            }))
+        if not frames:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+
+def _prefetch_filings(ciks, cache) -> dict:
+    """
+    Download the filings a ``calculate_many`` run needs, rate-limited, before workers are forked.
+
+    With a cache the payloads are written to it and ``{}`` is returned;
+    without one they are returned (and inherited by the forked workers).
+    """
+    from FortyFour.Finance.fetcher import fetch_company_filings
+
+    fetch = fetch_company_filings(ciks, cache=cache, collect=cache is None)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        results = asyncio.run(fetch)
+    else:
+        # Called from a running event loop (e.g. a notebook): run the fetch on its own loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = executor.submit(asyncio.run, fetch).result()
+    return {} if cache is not None else results
+
+
+def _init_worker(engine, cache, filings):
+    _worker_state["engine"] = engine
+    _worker_state["cache"] = cache
+    _worker_state["filings"] = filings
+
+
+def _calculate_in_worker(task) -> pd.DataFrame:
+    cik, name, metric_names, filings_type = task
+    cache = _worker_state["cache"]
+    company = Company(cik=cik, name=name, cache=cache)
+    if cache is None:
+        company.filing_data = _worker_state["filings"].get(company.cik, {})
+    elif cache.source_version(company.cik) is None:
+        # The prefetch failed for this company: workers never call the SEC themselves
+        logging.error(f"No cached filing data for CIK {company.cik}")
+        company.filing_data = {}
+    return _worker_state["engine"]._calculate_company(company, metric_names, filings_type)
+
+
+class _UnstableFingerprint(Exception):
+    """
+    Raised while fingerprinting a formula that depends on a value without a stable representation.
+    """
+
+
+# Values hashed through their repr, which is stable across processes
+_STABLE_SCALARS = (type(None), bool, int, float, complex, str, bytes)
+
+
+def _callable_fingerprint(func, seen=None) -> bytes:
+    """
+    Stable bytes describing a formula: its bytecode, defaults, closure values and referenced globals.
+
+    Helper functions reached through globals or closures are fingerprinted
+    recursively. Functions of installed packages and of the standard library
+    are identified by their qualified name and package version instead, so
+    the walk never descends into third-party internals. Raises
+    ``_UnstableFingerprint`` for values that cannot be hashed stably.
+    """
+    seen = set() if seen is None else seen
+    if isinstance(func, functools.partial):
+        return b"|".join([
+            _callable_fingerprint(func.func, seen),
+            _value_fingerprint(func.args, seen),
+            _value_fingerprint(func.keywords, seen),
+        ])
+    code = getattr(func, "__code__", None)
+    module = getattr(func, "__module__", None) or ""
+    if code is None or _is_library_module(module):
+        # Builtins, C functions and library code: identified by their qualified name
+        qualname = getattr(func, "__qualname__", type(func).__qualname__)
+        return f"{module}.{qualname}@{_package_version(module)}".encode()
+    if id(func) in seen:
+        return f"<recursive {func.__qualname__}>".encode()
+    seen.add(id(func))
+
+    parts = [
+        _code_fingerprint(code),
+        _value_fingerprint(func.__defaults__, seen),
+        _value_fingerprint(func.__kwdefaults__, seen),
+        _value_fingerprint(tuple(cell.cell_contents for cell in func.__closure__ or ()), seen),
+    ]
+    namespace = func.__globals__
+    for name in sorted(_code_names(code)):
+        # co_names also lists attribute names: only names bound in the module matter
+        if name in namespace:
+            parts.append(name.encode() + b"=" + _value_fingerprint(namespace[name], seen))
+    return b"|".join(parts)
+
+
+# Directories holding the standard library and installed packages
+_LIBRARY_PATHS = tuple({
+    os.path.normcase(os.path.realpath(path)) + os.sep
+    for key in ("stdlib", "platstdlib", "purelib", "platlib")
+    if (path := sysconfig.get_paths().get(key))
+})
+
+
+@functools.lru_cache(maxsize=None)
+def _is_library_module(module_name) -> bool:
+    """
+    Tell whether a module belongs to the standard library or an installed package rather than to user code.
+    """
+    if module_name in sys.builtin_module_names:
+        return True
+    path = getattr(sys.modules.get(module_name), "__file__", None)
+    if not path:
+        return False
+    path = os.path.normcase(os.path.realpath(path))
+    parts = path.split(os.sep)
+    return path.startswith(_LIBRARY_PATHS) or "site-packages" in parts or "dist-packages" in parts
+
+
+@functools.lru_cache(maxsize=None)
+def _package_version(module_name) -> str:
+    top_level = module_name.partition(".")[0]
+    version = getattr(sys.modules.get(top_level), "__version__", None)
+    return str(version) if version is not None else sys.version.split()[0]
+
+
+def _code_fingerprint(code) -> bytes:
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        parts.append(_code_fingerprint(const) if hasattr(const, "co_code") else repr(const).encode())
+    return b"|".join(parts)
+
+
+def _code_names(code) -> set:
+    """
+    Global (and attribute) names used by a code object and the functions nested in it.
+    """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            names |= _code_names(const)
+    return names
+
+
+def _value_fingerprint(value, seen) -> bytes:
+    if isinstance(value, _STABLE_SCALARS):
+        return f"{type(value).__name__}:{value!r}".encode()
+    if isinstance(value, (tuple, list)):
+        return b"[" + b",".join(_value_fingerprint(item, seen) for item in value) + b"]"
+    if isinstance(value, (set, frozenset)):
+        return b"{" + b",".join(sorted(_value_fingerprint(item, seen) for item in value)) + b"}"
+    if isinstance(value, dict):
+        items = sorted(_value_fingerprint(key, seen) + b":" + _value_fingerprint(item, seen) for key, item in value.items())
+        return b"{" + b",".join(items) + b"}"
+    if isinstance(value, types.ModuleType):
+        return f"module:{value.__name__}".encode()
+    if isinstance(value, type):
+        return f"type:{value.__module__}.{value.__qualname__}".encode()
+    if hasattr(value, "__code__") or isinstance(value, functools.partial):
+        return _callable_fingerprint(value, seen)
+    if callable(value) and hasattr(value, "__name__"):
+        # Builtins, ufuncs and other compiled functions
+        return _callable_fingerprint(value, seen)
+    raise _UnstableFingerprint(type(value).__qualname__)
+
+
+def _serialize_series(series: pd.Series) -> str:
+    is_datetime = isinstance(series.index, pd.DatetimeIndex)
+    index = [ts.isoformat() for ts in series.index] if is_datetime else series.index.tolist()
+    return json.dumps({
+        "datetime_index": is_datetime,
+        "index": index,
+        "index_name": series.index.name,
+        "values": series.tolist(),
+        "name": series.name,
+    }, default=str)
+
+
+def _deserialize_series(payload: str) -> pd.Series:
+    data = json.loads(payload)
+    if not data["values"]:
+        return pd.Series(dtype=float, name=data["name"])
+    index = pd.to_datetime(data["index"]) if data["datetime_index"] else pd.Index(data["index"])
+    return pd.Series(data["values"], index=index.rename(data["index_name"]), name=data["name"])
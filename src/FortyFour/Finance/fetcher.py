@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import math
+import time
+
+import httpx
+
+from FortyFour.Finance.instrumentation import telemetry
+from FortyFour.Finance.utils import (
+    COMPANY_FACTS_URL,
+    DEFAULT_HEADERS,
+    LOGO_HEADERS,
+    LOGO_PLACEHOLDER_URL,
+    SECCache,
+    conditional_headers,
+    logo_slug,
+    logo_url,
+    normalize_cik,
+    response_validators,
+)
+
+# HTTP statuses worth retrying: SEC throttling and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket allowing ``rate`` acquisitions per second, with bursts up to ``capacity``.
+
+    The default capacity of 1 spaces acquisitions evenly, so no one-second
+    window ever sees more than ``rate`` of them. Larger capacities allow
+    bursts above ``rate`` right after an idle period.
+    """
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Wait until a token is available and consume it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_company_filings(
+    ciks,
+    cache: SECCache = None,
+    concurrency: int = 8,
+    max_rps: float = 10,
+    max_retries: int = 4,
+    backoff: float = 1.0,
+    timeout: float = 30,
+    collect: bool = True,
+    client: httpx.AsyncClient = None,
+) -> dict:
+    """
+    Fetch company facts for many CIKs concurrently over one shared connection pool.
+
+    Requests are throttled by a token bucket to ``max_rps`` (SEC allows 10
+    requests/second), 429 and 5xx responses are retried with exponential
+    backoff (honouring ``Retry-After``), and every payload is written to
+    ``cache`` as soon as it lands. CIKs already fresh in the cache are not
+    requested again, and expired ones are revalidated with conditional GETs
+    (a ``304`` only refreshes the entry's timestamp).
+
+    Returns a dict mapping each normalized CIK to its payload (``{}`` on
+    failure, like ``request_company_filing``). With ``collect=False`` the
+    payloads are not kept in memory and the values are success booleans,
+    which suits cache-warming runs over the whole universe.
+
+    Usage:
+        results = asyncio.run(fetch_company_filings(ciks, cache=cache))
+    """
+    # No bursts: SEC's limit applies to any one-second window
+    bucket = TokenBucket(max_rps, capacity=1)
+    semaphore = asyncio.Semaphore(concurrency)
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def fetch_one(cik_str):
+        validators = {}
+        if cache:
+            if not collect:
+                # Only the freshness matters: skip reading and decoding the payload
+                if await asyncio.to_thread(cache.source_version, cik_str) is not None:
+                    return cik_str, True
+            else:
+                cached_data = await asyncio.to_thread(cache.get, cik_str)
+                if cached_data:
+                    return cik_str, cached_data
+            validators = await asyncio.to_thread(cache.get_validators, cik_str)
+        async with semaphore:
+            response = await _get_with_retries(
+                client, bucket, cik_str, conditional_headers(validators), max_retries, backoff
+            )
+        if response is None:
+            return cik_str, {}
+        return cik_str, await asyncio.to_thread(_handle_response, cik_str, response, cache)
+
+    try:
+        results = {}
+        tasks = [fetch_one(cik_str) for cik_str in dict.fromkeys(normalize_cik(cik) for cik in ciks)]
+        for task in asyncio.as_completed(tasks):
+            cik_str, data = await task
+            results[cik_str] = data if collect else bool(data)
+        return results
+    finally:
+        if owns_client:
+            await client.aclose()
+
+
+async def fetch_logo_urls(
+    names,
+    cache: SECCache = None,
+    concurrency: int = 16,
+    max_age_days: float = 7,
+    negative_max_age_days: float = 1,
+    timeout: float = 2,
+    client: httpx.AsyncClient = None,
+) -> dict:
+    """
+    Resolve the TradingView logo URLs of many company names concurrently.
+
+    Names are normalized like ``get_company_logo_url`` and each distinct
+    slug is checked once with a HEAD request, at most ``concurrency`` at a
+    time. With a cache, outcomes are persisted: found logos for
+    ``max_age_days`` and missing ones (mapped to the placeholder) for
+    ``negative_max_age_days``. Network errors and 5xx answers fall back to
+    the placeholder without being cached.
+
+    Returns a dict mapping each name to its logo URL or the placeholder.
+
+    Usage:
+        urls = asyncio.run(fetch_logo_urls(screener["NAME"], cache=cache))
+    """
+    slugs = {name: logo_slug(name) for name in dict.fromkeys(names)}
+    distinct = {slug for slug in slugs.values() if slug}
+    known = await asyncio.to_thread(cache.get_logos, distinct, max_age_days, negative_max_age_days) if cache else {}
+    semaphore = asyncio.Semaphore(concurrency)
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def check(slug):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.head(logo_url(slug), headers=LOGO_HEADERS)
+            except httpx.HTTPError as e:
+                logging.warning(f"Failed to check logo {slug}: {e}")
+                return slug, None
+        telemetry.observe("http.request", time.perf_counter() - start, client="httpx", status=response.status_code)
+        if response.status_code >= 500:
+            return slug, None
+        return slug, response.status_code == 200
+
+    try:
+        checked = await asyncio.gather(*(check(slug) for slug in distinct - known.keys()))
+    finally:
+        if owns_client:
+            await client.aclose()
+    found = {slug: result for slug, result in checked if result is not None}
+    if cache and found:
+        await asyncio.to_thread(cache.store_logos, found)
+    known.update(found)
+    return {name: logo_url(slug) if known.get(slug) else LOGO_PLACEHOLDER_URL for name, slug in slugs.items()}
+
+
+async def _get_with_retries(client, bucket, cik_str, headers, max_retries, backoff):
+    """
+    Issue the GET for a CIK, retrying throttled/transient failures. Returns the final response or ``None``.
+    """
+    url = COMPANY_FACTS_URL.format(cik=cik_str)
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, headers={**DEFAULT_HEADERS, **headers})
+        except httpx.TransportError as e:
+            telemetry.observe("http.request", time.perf_counter() - start, client="httpx", status=None)
+            delay, reason = backoff * 2 ** attempt, str(e)
+        else:
+            telemetry.observe("http.request", time.perf_counter() - start, client="httpx", status=response.status_code)
+            telemetry.increment("http.bytes", len(response.content), client="httpx")
+            if response.status_code not in RETRYABLE_STATUSES:
+                return response
+            delay, reason = _retry_after(response, backoff * 2 ** attempt), f"HTTP {response.status_code}"
+        if attempt < max_retries:
+            logging.warning(f"Retrying {cik_str} in {delay:.1f}s after {reason}")
+            await asyncio.sleep(delay)
+    logging.error(f"Failed to fetch filing data for {cik_str} after {max_retries + 1} attempts: {reason}")
+    return None
+
+
+def _handle_response(cik_str, response, cache) -> dict:
+    """
+    Decode a final response and record it in the cache (runs in a worker thread).
+    """
+    if response.status_code == 304 and cache:
+        cache.touch(cik_str)
+        return cache.get(cik_str, max_age_days=math.inf) or {}
+    try:
+        response.raise_for_status()
+        with telemetry.timer("http.decode"):
+            data = response.json()
+    except (httpx.HTTPStatusError, ValueError) as e:
+        logging.error(f"Failed to fetch filing data for {cik_str}: {e}")
+        return {}
+    if cache:
+        cache.store(cik_str, data, **response_validators(response.headers))
+    return data
+
+
+def _retry_after(response, default: float) -> float:
+    try:
+        return max(float(response.headers["Retry-After"]), default)
+    except (KeyError, ValueError):
+        return default
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Instrumentation:
+    """
+    Process-wide counters and timers for the Finance hot paths.
+
+    Events are aggregated in memory (see ``snapshot``) and forwarded to
+    listeners, callables invoked as ``listener(kind, name, value, attributes)``
+    where ``kind`` is ``"counter"`` or ``"timer"`` (value in seconds).
+
+    Events emitted by the package:
+
+    - ``sec_cache.hit`` / ``sec_cache.miss`` / ``sec_cache.stale`` (``tier``: memory, sqlite or facts)
+    - ``sec_cache.decode`` timer: decompressing and parsing a stored payload (``codec``)
+    - ``http.request`` timer (``client``, ``status``) and ``http.bytes`` counter
+    - ``http.decode`` timer: parsing a downloaded payload
+    - ``metric.compute`` timer (``metric``) and ``metric_cache.hit`` / ``metric_cache.miss``
+
+    Worker processes of ``MetricEngine.calculate_many`` aggregate into their
+    own copy; attach listeners that export (e.g. OpenTelemetry) to see them.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._listeners = []
+        self._counters = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        Forward every event to ``listener(kind, name, value, attributes)``.
+        """
+        self._listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def increment(self, name, value=1, **attributes):
+        """
+        Add ``value`` to the counter ``name``.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        self._emit("counter", name, value, attributes)
+
+    def observe(self, name, seconds, **attributes):
+        """
+        Record one duration (in seconds) for the timer ``name``.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            count, total, longest = self._timers.get(name, (0, 0.0, 0.0))
+            self._timers[name] = (count + 1, total + seconds, max(longest, seconds))
+        self._emit("timer", name, seconds, attributes)
+
+    @contextmanager
+    def timer(self, name, **attributes):
+        """
+        Time the enclosed block. The yielded dict can be updated with attributes known only at the end.
+
+        Usage:
+            with telemetry.timer("http.request") as attributes:
+                response = ...
+                attributes["status"] = response.status_code
+        """
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.observe(name, time.perf_counter() - start, **attributes)
+
+    def snapshot(self) -> dict:
+        """
+        Return the aggregated counters and timers (``count``, ``total`` and ``max`` seconds).
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timers": {
+                    name: {"count": count, "total": total, "max": longest}
+                    for name, (count, total, longest) in self._timers.items()
+                },
+            }
+
+    def reset(self):
+        """
+        Clear the aggregated values (listeners are kept).
+        """
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def _emit(self, kind, name, value, attributes):
+        for listener in self._listeners:
+            try:
+                listener(kind, name, value, attributes)
+            except Exception as e:
+                logging.error(f"Instrumentation listener {listener!r} failed on {name}: {e}")
+
+
+class OpenTelemetryListener:
+    """
+    Forward instrumentation events to an OpenTelemetry ``Meter``.
+
+    Counters become OTel counters and timers become histograms in seconds,
+    named ``prefix + name``. Any object with ``create_counter`` and
+    ``create_histogram`` works, so OpenTelemetry stays an optional dependency.
+
+    Usage:
+        from opentelemetry import metrics
+        telemetry.add_listener(OpenTelemetryListener(metrics.get_meter("fortyfour")))
+    """
+    def __init__(self, meter, prefix="fortyfour."):
+        self.meter = meter
+        self.prefix = prefix
+        self._instruments = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, kind, name, value, attributes):
+        instrument = self._instruments.get((kind, name))
+        if instrument is None:
+            with self._lock:
+                instrument = self._instruments.get((kind, name))
+                if instrument is None:
+                    if kind == "timer":
+                        instrument = self.meter.create_histogram(self.prefix + name, unit="s")
+                    else:
+                        instrument = self.meter.create_counter(self.prefix + name)
+                    self._instruments[(kind, name)] = instrument
+        if kind == "timer":
+            instrument.record(value, attributes=attributes)
+        else:
+            instrument.add(value, attributes=attributes)
+
+
+# Instrumentation shared by the whole package
+telemetry = Instrumentation()
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# Forms whose facts feed the period engine
+PERIOD_FORMS = ("10-K", "10-K/A", "10-Q", "10-Q/A")
+
+# Average length of a fiscal quarter and the tolerance used to classify durations
+# (52/53-week fiscal years make quarters drift by a few days)
+QUARTER_DAYS = 365.25 / 4
+DURATION_TOLERANCE_DAYS = 20
+
+
+class PeriodComponent(tuple):
+    """
+    A synonym list resolved on a derived period basis rather than raw filing values.
+
+    Use the ``TTM`` and ``Quarterly`` subclasses as ``MetricRegistry`` components.
+    """
+    basis = None
+
+    def __new__(cls, synonyms):
+        return super().__new__(cls, synonyms)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class TTM(PeriodComponent):
+    """
+    Trailing-twelve-month values of the first synonym with data.
+    """
+    basis = "ttm"
+
+
+class Quarterly(PeriodComponent):
+    """
+    Discrete quarterly values of the first synonym with data.
+    """
+    basis = "quarterly"
+
+
+def _empty_series() -> pd.Series:
+    return pd.Series(dtype=float, index=pd.DatetimeIndex([], name="Date"), name="val")
+
+
+def _to_series(values, ends) -> pd.Series:
+    return pd.Series(np.asarray(values), index=pd.DatetimeIndex(ends, name="Date"), name="val")
+
+
+def is_instant(rows: pd.DataFrame) -> bool:
+    """
+    Whether facts are point-in-time values (balance-sheet items) rather than durations.
+    """
+    return rows["start"].isna().all()
+
+
+def _latest_instants(rows: pd.DataFrame) -> pd.Series:
+    rows = rows.dropna(subset=["end"]).sort_values(["end", "filed"], ascending=[True, False], kind="stable")
+    rows = rows.drop_duplicates(subset=["end"], keep="first")
+    return _to_series(rows["val"], rows["end"])
+
+
+def quarterly_values(rows: pd.DataFrame) -> pd.Series:
+    """
+    Derive discrete fiscal-quarter values from raw facts of one tag.
+
+    Args:
+        rows (pd.DataFrame): Facts with datetime ``start``/``end``/``filed`` columns and ``val``,
+            typically from ``Company.facts_frame`` (10-K and 10-Q forms).
+
+    Returns:
+        A Date-indexed Series with one value per quarter end. Reported
+        3-month values are used as-is; missing quarters are derived from
+        year-to-date values sharing the same start (Q2 = H1 - Q1,
+        Q3 = 9M - H1, Q4 = FY - 9M). Instant facts are returned per end date.
+    """
+    if rows.empty:
+        return _empty_series()
+    if is_instant(rows):
+        return _latest_instants(rows)
+
+    df = rows.dropna(subset=["start", "end"])
+    # Latest filed value for each exact period, so restatements win
+    df = df.sort_values(["start", "end", "filed"], ascending=[True, True, False], kind="stable")
+    df = df.drop_duplicates(subset=["start", "end"], keep="first")
+
+    days = (df["end"] - df["start"]).dt.days.to_numpy() + 1
+    quarters = np.rint(days / QUARTER_DAYS)
+    valid = (quarters >= 1) & (quarters <= 4) & (np.abs(days - quarters * QUARTER_DAYS) <= DURATION_TOLERANCE_DAYS)
+    df = df.assign(quarters=quarters)[valid]
+    if df.empty:
+        return _empty_series()
+
+    # Within a run of cumulative values sharing one start, each step adds exactly one quarter
+    grouped = df.groupby("start", sort=False)
+    previous_val = grouped["val"].shift()
+    previous_quarters = grouped["quarters"].shift()
+    direct = df["quarters"].to_numpy() == 1
+    derived = ~direct & ((df["quarters"] - previous_quarters).to_numpy() == 1)
+
+    candidates = pd.DataFrame({
+        "end": df["end"].to_numpy(),
+        "filed": df["filed"].to_numpy(),
+        "val": np.where(direct, df["val"].to_numpy(dtype=float), (df["val"] - previous_val).to_numpy(dtype=float)),
+        # Reported quarters take precedence over derived ones for the same end date
+        "priority": np.where(direct, 0, 1),
+    })[direct | derived]
+    candidates = candidates.sort_values(["end", "priority", "filed"], ascending=[True, True, False], kind="stable")
+    candidates = candidates.drop_duplicates(subset=["end"], keep="first")
+    return _to_series(candidates["val"], candidates["end"])
+
+
+def trailing_twelve_months(rows: pd.DataFrame) -> pd.Series:
+    """
+    Derive trailing-twelve-month values from raw facts of one tag.
+
+    Duration facts are summed over four consecutive discrete quarters (a
+    window is skipped when a quarter is missing); instant facts are returned
+    per end date, since a balance is already a point-in-time value.
+    """
+    if rows.empty:
+        return _empty_series()
+    if is_instant(rows):
+        return _latest_instants(rows)
+    return ttm_from_quarters(quarterly_values(rows))
+
+
+def ttm_from_quarters(quarters: pd.Series) -> pd.Series:
+    """
+    Rolling four-quarter sums of a discrete quarterly series, kept only where the four quarters are contiguous.
+    """
+    if len(quarters) < 4:
+        return _empty_series()
+    totals = quarters.rolling(4).sum()
+    span = quarters.index.to_series().diff(3).dt.days
+    contiguous = (span - 3 * QUARTER_DAYS).abs() <= DURATION_TOLERANCE_DAYS
+    return totals[contiguous.to_numpy()].rename("val")
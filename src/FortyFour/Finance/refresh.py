@@ -0,0 +1,117 @@
+import io
+import logging
+import os
+import re
+from datetime import date
+
+from FortyFour.Finance.utils import DEFAULT_HEADERS, SECCache, normalize_cik, request_company_filing
+
+FORM_INDEX_URL = "https://www.sec.gov/Archives/edgar/daily-index/{year}/QTR{quarter}/form.{day:%Y%m%d}.idx"
+
+# Filings that change a company's XBRL financial data
+DEFAULT_REFRESH_FORMS = ("10-K", "10-K/A", "10-Q", "10-Q/A")
+
+# Right-hand side of an index row: <company name> <CIK> <date filed> <file name>
+_ROW_TAIL = re.compile(r"^(?P<company_name>.*?)\s+(?P<cik>\d+)\s+(?P<date_filed>\d{8}|\d{4}-\d{2}-\d{2})\s+(?P<file_name>\S+)\s*$")
+
+
+def parse_form_index(source) -> list:
+    """
+    Parse an EDGAR daily form index (``form.YYYYMMDD.idx``).
+
+    Args:
+        source: A path to a local index file, or a text file-like object.
+
+    Returns:
+        A list of dicts with keys form_type, company_name, cik, date_filed and file_name.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="latin-1") as fh:
+            return parse_form_index(fh)
+
+    rows = []
+    company_column = None
+    for line in source:
+        line = line.rstrip("\n")
+        if company_column is None:
+            # Everything before the "Form Type ... Company Name" header is a free-text preamble
+            if line.startswith("Form Type") and "Company Name" in line:
+                company_column = line.index("Company Name")
+            continue
+        if not line.strip() or set(line.strip()) == {"-"}:
+            continue
+        match = _ROW_TAIL.match(line[company_column:])
+        if not match:
+            logging.warning(f"Skipping malformed form index row: {line!r}")
+            continue
+        rows.append({"form_type": line[:company_column].strip(), **match.groupdict()})
+    return rows
+
+
+def download_form_index(day: date) -> io.StringIO:
+    """
+    Download the EDGAR daily form index of a given day.
+    """
+    import requests
+
+    quarter = (day.month - 1) // 3 + 1
+    url = FORM_INDEX_URL.format(year=day.year, quarter=quarter, day=day)
+    response = requests.get(url, headers=DEFAULT_HEADERS, timeout=30)
+    response.raise_for_status()
+    return io.StringIO(response.text)
+
+
+class RefreshPlanner:
+    """
+    Plans targeted cache refreshes from the EDGAR daily form index.
+
+    Instead of letting every entry expire after ``max_age_days``, the planner
+    flags as stale only the companies that filed one of ``forms`` on a given
+    day, then refreshes just those. Pair it with ``SECCache(max_age_days=math.inf)``
+    so that untouched companies are never re-downloaded.
+    """
+    def __init__(self, cache: SECCache, forms=DEFAULT_REFRESH_FORMS):
+        self.cache = cache
+        self.forms = set(forms)
+
+    def plan(self, index_source, only_cached: bool = True) -> list:
+        """
+        Return the normalized CIKs with a qualifying filing in the index, in index order.
+
+        Args:
+            index_source: A local index path or file-like object (see ``parse_form_index``).
+            only_cached (bool): Restrict the plan to companies already in the cache.
+        """
+        ciks = list(dict.fromkeys(
+            normalize_cik(row["cik"]) for row in parse_form_index(index_source) if row["form_type"] in self.forms
+        ))
+        if only_cached:
+            cached = self.cache.cached_ciks(ciks)
+            ciks = [cik for cik in ciks if cik in cached]
+        return ciks
+
+    def mark_stale(self, index_source, only_cached: bool = True) -> list:
+        """
+        Flag the planned CIKs as stale in the cache and return them.
+        """
+        ciks = self.plan(index_source, only_cached=only_cached)
+        flagged = self.cache.mark_stale(ciks)
+        logging.info(f"Marked {flagged} companies stale from the form index")
+        return ciks
+
+    def refresh(self, index_source, only_cached: bool = True, fetch=None) -> dict:
+        """
+        Mark the planned CIKs stale and re-fetch them.
+
+        Args:
+            fetch (callable): ``fetch(cik, cache=...)`` used for each CIK, defaulting to
+                ``request_company_filing``.
+
+        Returns:
+            A dict mapping each refreshed CIK to whether new data was obtained.
+        """
+        fetch = fetch or request_company_filing
+        results = {}
+        for cik in self.mark_stale(index_source, only_cached=only_cached):
+            results[cik] = bool(fetch(cik, cache=self.cache))
+        return results
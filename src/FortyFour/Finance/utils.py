@@ -1,12 +1,25 @@
+import difflib
+import io
 import json
 from functools import cache
-import requests
-import pandas as pd
-import plotly.express as px
 import logging
+import math
+import os
 import re
 import sqlite3
+import threading
 import time
+import zipfile
+import zlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from FortyFour.Finance.instrumentation import telemetry
+
+# pandas, plotly and requests are imported by the functions that need them, keeping
+# ``from FortyFour.Finance import SECCache`` cheap for CLIs and short-lived workers
+if TYPE_CHECKING:
+    import pandas as pd
 
 # SEC EDGAR requires a User-Agent that identifies the user (Name and Email)
 DEFAULT_HEADERS = {
@@ -14,16 +27,137 @@ DEFAULT_HEADERS = {
     'Accept': 'application/json'
 }
 
+COMPANY_FACTS_URL = "https://data.sec.gov/api/xbrl/companyfacts/{cik}.json"
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
+LOGO_BASE_URL = "https://s3-symbol-logo.tradingview.com/"
+LOGO_PLACEHOLDER_URL = "https://placehold.co/600x400?text=Logo"
+LOGO_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
 class SECCache:
     """
     A SQLite-backed cache for SEC EDGAR company facts.
+
+    With ``normalized=True`` every stored payload is also flattened into the
+    ``sec_facts`` table (one row per reported value, indexed on cik/tag/form)
+    so a single tag can be read with an indexed query instead of
+    deserializing the whole companyfacts document.
+
+    ``compression`` ("zlib" or "zstd", the latter requiring the optional
+    ``zstandard`` package) compresses new payloads. Each row records its
+    storage format in the ``version`` column, so uncompressed rows written
+    by older releases remain readable.
+
+    ``codec`` selects the serializer of new payloads: ``"orjson"`` or
+    ``"msgpack"`` (optional packages) or the stdlib ``"json"``. The default
+    ``"auto"`` uses orjson when it is installed. The codec is recorded per
+    row in the ``codec`` column, so reads never depend on the current
+    setting.
+
+    Entries expire after ``max_age_days`` (``math.inf`` disables expiry) or
+    as soon as they are flagged with ``mark_stale`` (see ``RefreshPlanner``).
+
+    ``max_entries`` and ``max_bytes`` bound the cache: after each write the
+    least recently used companies (by their ``last_accessed`` time) are
+    evicted until both limits hold, and the freed pages are returned to the
+    filesystem with an incremental vacuum (see ``evict`` and ``vacuum``).
+    ``max_bytes`` counts each company's payload, normalized facts and metric
+    results.
+
+    ``memory_bytes`` enables an in-process LRU tier holding already-parsed
+    documents, bounded by their estimated in-memory size (the decoded
+    payload size times a per-codec factor measured on SEC documents). A hit only costs a lookup
+    of the row's freshness and version, with no payload read or decode;
+    hits and misses are counted in ``memory_stats()``. Documents served
+    from memory are shared between callers and must be treated as read-only.
+
+    Each thread keeps one long-lived connection (re-opened after a fork),
+    tuned with WAL journaling so concurrent readers do not block each other.
+    Call ``close()`` or use the cache as a context manager to release them.
     """
-    def __init__(self, db_path="sec_data.db"):
+    def __init__(self, db_path="sec_data.db", normalized=False, compression=None, max_age_days=1, codec="auto",
+                 max_entries=None, max_bytes=None, memory_bytes=0, journal_mode="WAL", synchronous="NORMAL", mmap_size=256 * 1024 * 1024, cache_size=-64000):
+        if compression not in _COMPRESSION_FORMATS:
+            raise ValueError(f"Unsupported compression {compression!r}, expected one of {list(_COMPRESSION_FORMATS)}")
+        if compression == "zstd":
+            _import_zstandard()
         self.db_path = db_path
+        self.normalized = normalized
+        self.compression = compression
+        self.codec = _resolve_codec(codec)
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        # cache_size follows SQLite semantics: negative values are KiB, positive values are pages.
+        # auto_vacuum only applies to new databases and must precede the switch to WAL.
+        self.pragmas = {
+            "auto_vacuum": "INCREMENTAL",
+            "journal_mode": journal_mode,
+            "synchronous": synchronous,
+            "mmap_size": int(mmap_size),
+            "cache_size": int(cache_size),
+        }
+        self._lock = threading.Lock()
+        self._memory = _MemoryTier(memory_bytes) if memory_bytes else None
+        self._reset_connections()
         self._init_db()
 
+    def __getstate__(self):
+        # Connections and locks are per process: a pickled cache reconnects on first use
+        state = self.__dict__.copy()
+        for attribute in ("_lock", "_local", "_connections", "_pid", "_memory"):
+            state.pop(attribute)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._memory = _MemoryTier(self.memory_bytes) if self.memory_bytes else None
+        self._reset_connections()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _reset_connections(self):
+        self._local = threading.local()
+        self._connections = []
+        self._pid = os.getpid()
+
+    def _connection(self):
+        """
+        Return the calling thread's connection, opening it on first use.
+        """
+        if self._pid != os.getpid():
+            # SQLite handles must not cross a fork: drop (without closing) the parent's connections
+            with self._lock:
+                self._reset_connections()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            for pragma, value in self.pragmas.items():
+                if value is not None:
+                    conn.execute(f"PRAGMA {pragma}={value}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """
+        Close every connection opened by this cache. The cache reconnects lazily if used again.
+        """
+        with self._lock:
+            connections = self._connections
+            self._reset_connections()
+        for conn in connections:
+            conn.close()
+
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
+        conn = self._connection()
+        with conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS sec_cache (
                     cik TEXT PRIMARY KEY,
@@ -31,56 +165,954 @@ class SECCache:
                     last_updated REAL
                 )
             """)
+            _ensure_column(conn, "sec_cache", "facts_indexed", "INTEGER DEFAULT 0")
+            _ensure_column(conn, "sec_cache", "version", f"INTEGER DEFAULT {_FORMAT_JSON}")
+            _ensure_column(conn, "sec_cache", "etag", "TEXT")
+            _ensure_column(conn, "sec_cache", "last_modified", "TEXT")
+            # Time the payload itself was last written; unlike last_updated it is not bumped by a 304
+            _ensure_column(conn, "sec_cache", "stored_at", "REAL")
+            _ensure_column(conn, "sec_cache", "stale", "INTEGER DEFAULT 0")
+            _ensure_column(conn, "sec_cache", "codec", "TEXT DEFAULT 'json'")
+            _ensure_column(conn, "sec_cache", "last_accessed", "REAL")
+            _ensure_column(conn, "sec_cache", "size_bytes", "INTEGER")
+            # Total size of the company's metric_cache results, kept up to date by store_metric_result
+            metric_bytes_added = _ensure_column(conn, "sec_cache", "metric_bytes", "INTEGER DEFAULT 0")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sec_facts (
+                    cik TEXT NOT NULL,
+                    taxonomy TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    unit TEXT,
+                    form TEXT,
+                    fy INTEGER,
+                    fp TEXT,
+                    period_start TEXT,
+                    period_end TEXT,
+                    filed TEXT,
+                    accn TEXT,
+                    frame TEXT,
+                    val NUMERIC
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sec_facts_lookup "
+                "ON sec_facts (cik, tag, form, period_end, filed)"
+            )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metric_cache (
+                    cik TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    filings_type TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    source_version REAL NOT NULL,
+                    data TEXT,
+                    computed_at REAL,
+                    PRIMARY KEY (cik, metric, filings_type)
+                )
+            """)
+            if metric_bytes_added:
+                conn.execute(
+                    "UPDATE sec_cache SET metric_bytes = COALESCE("
+                    "(SELECT SUM(LENGTH(CAST(data AS BLOB))) FROM metric_cache WHERE metric_cache.cik = sec_cache.cik), 0)"
+                )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sec_tickers (
+                    ticker TEXT PRIMARY KEY,
+                    cik TEXT NOT NULL,
+                    name TEXT,
+                    exchange TEXT,
+                    name_key TEXT,
+                    updated_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sec_tickers_name ON sec_tickers (name_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sec_tickers_cik ON sec_tickers (cik)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS logo_cache (
+                    slug TEXT PRIMARY KEY,
+                    found INTEGER NOT NULL,
+                    checked_at REAL NOT NULL
+                )
+            """)
+
+    def _is_fresh(self, last_updated, stale, max_age_days):
+        if stale:
+            return False
+        if max_age_days is None:
+            max_age_days = self.max_age_days
+        return (time.time() - last_updated) / 86400 <= max_age_days
 
-    def get(self, cik, max_age_days=1):
+    def get(self, cik, max_age_days=None, tags=None, taxonomies=None):
         """
-        Retrieve cached data for a CIK if it's within the max age.
+        Retrieve cached data for a CIK if it's within the max age (defaults to the cache's ``max_age_days``).
+
+        With ``tags`` and/or ``taxonomies``, only those facts are extracted
+        (streamed with ``ijson`` when installed) instead of materializing the
+        whole document.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT data, last_updated FROM sec_cache WHERE cik = ?", (cik,))
-            row = cursor.fetchone()
-            if row:
-                data_str, last_updated = row
-                if (time.time() - last_updated) / 86400 <= max_age_days:
-                    return json.loads(data_str)
-        return None
+        conn = self._connection()
+        memory = self._memory
+        if memory is not None:
+            row = conn.execute(
+                "SELECT last_updated, stale, last_accessed, COALESCE(stored_at, last_updated) "
+                "FROM sec_cache WHERE cik = ?", (cik,)
+            ).fetchone()
+            fresh = row is not None and self._is_fresh(row[0], row[1], max_age_days)
+            document = memory.get(cik, row[3] if fresh else None)
+            if document is not None:
+                telemetry.increment("sec_cache.hit", tier="memory")
+                self._record_access(cik, row[2])
+                return _select_facts(document, tags, taxonomies)
+            if not fresh:
+                telemetry.increment("sec_cache.miss" if row is None else "sec_cache.stale", tier="sqlite")
+                return None
+
+        row = conn.execute(
+            "SELECT data, last_updated, version, stale, codec, last_accessed, COALESCE(stored_at, last_updated) "
+            "FROM sec_cache WHERE cik = ?", (cik,)
+        ).fetchone()
+        if row is None:
+            telemetry.increment("sec_cache.miss", tier="sqlite")
+            return None
+        payload, last_updated, version, stale, codec, last_accessed, stored_at = row
+        if not self._is_fresh(last_updated, stale, max_age_days):
+            telemetry.increment("sec_cache.stale", tier="sqlite")
+            return None
+        telemetry.increment("sec_cache.hit", tier="sqlite")
+        self._record_access(cik, last_accessed)
+        with telemetry.timer("sec_cache.decode", codec=codec):
+            raw = _decompress_payload(payload, version)
+            if memory is not None:
+                # Hot documents are kept whole, so decode everything once rather than a selection
+                document = _decode_document(raw, codec)
+                memory.put(cik, stored_at, document, int(len(raw) * _PARSED_SIZE_FACTORS.get(codec, 4)))
+                return _select_facts(document, tags, taxonomies)
+            if codec == "msgpack":
+                return _select_facts(_decode_document(raw, codec), tags, taxonomies)
+            if tags or taxonomies:
+                return extract_facts(raw, tags=tags, taxonomies=taxonomies)
+            return _decode_document(raw, codec)
 
-    def store(self, cik, data):
+    def memory_stats(self) -> dict:
         """
-        Store data in the cache for a CIK.
+        Return the counters of the in-memory tier (``hits``, ``misses``, ``entries``, ``bytes``).
         """
-        with sqlite3.connect(self.db_path) as conn:
+        if self._memory is None:
+            return {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+        return self._memory.stats()
+
+    def get_fact_entries(self, cik, tag, form, max_age_days=None):
+        """
+        Retrieve the raw entries of a single tag/form from the normalized facts table.
+
+        Returns ``None`` when the CIK is missing, stale or was stored without
+        normalization (the caller should fall back to the full document), and
+        an empty list when the company simply does not report the tag.
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT last_updated, stale, facts_indexed, last_accessed FROM sec_cache WHERE cik = ?", (cik,)
+        ).fetchone()
+        if not row or not self._is_fresh(row[0], row[1], max_age_days):
+            telemetry.increment("sec_cache.miss" if row is None else "sec_cache.stale", tier="facts")
+            return None
+        if not row[2]:
+            return None
+        telemetry.increment("sec_cache.hit", tier="facts")
+        self._record_access(cik, row[3])
+        cursor = conn.execute(
+            "SELECT val, period_start, period_end, filed, form, fy, fp, accn, frame "
+            "FROM sec_facts WHERE cik = ? AND tag = ? AND form = ?",
+            (cik, tag, form)
+        )
+        return [dict(zip(_FACT_ENTRY_FIELDS, values)) for values in cursor]
+
+    def _record_access(self, cik, last_accessed):
+        # Coarse-grained on purpose: hot readers should not turn every hit into a write
+        now = time.time()
+        if last_accessed is None or now - last_accessed > _ACCESS_RESOLUTION_SECONDS:
+            conn = self._connection()
+            with conn:
+                conn.execute("UPDATE sec_cache SET last_accessed = ? WHERE cik = ?", (now, cik))
+
+    def get_validators(self, cik):
+        """
+        Return the HTTP validators (``ETag``/``Last-Modified``) recorded for a CIK, regardless of its age.
+        """
+        row = self._connection().execute(
+            "SELECT etag, last_modified FROM sec_cache WHERE cik = ?", (cik,)
+        ).fetchone()
+        if not row:
+            return {}
+        return {key: value for key, value in zip(("etag", "last_modified"), row) if value}
+
+    def touch(self, cik):
+        """
+        Mark a CIK as fresh without rewriting its payload (e.g. after an HTTP 304).
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE sec_cache SET last_updated = ?, stale = 0 WHERE cik = ?", (time.time(), cik))
+
+    def mark_stale(self, ciks):
+        """
+        Flag CIKs as stale so their next read triggers a refresh, whatever their age.
+
+        Returns the number of cached entries flagged.
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.executemany("UPDATE sec_cache SET stale = 1 WHERE cik = ?", ((cik,) for cik in ciks))
+        return cursor.rowcount
+
+    def cached_ciks(self, ciks=None):
+        """
+        Return the cached CIKs, optionally restricted to the given ones.
+        """
+        rows = self._connection().execute("SELECT cik FROM sec_cache")
+        cached = {row[0] for row in rows}
+        if ciks is None:
+            return cached
+        return {cik for cik in ciks if cik in cached}
+
+    def source_version(self, cik, max_age_days=None):
+        """
+        Identify the cached payload of a CIK for derived caches: the time it was last written.
+
+        Returns ``None`` when the CIK is missing or stale, i.e. when reading
+        its facts would trigger a refresh.
+        """
+        row = self._connection().execute(
+            "SELECT last_updated, stale, COALESCE(stored_at, last_updated) FROM sec_cache WHERE cik = ?", (cik,)
+        ).fetchone()
+        if not row or not self._is_fresh(row[0], row[1], max_age_days):
+            return None
+        return row[2]
+
+    def get_metric_result(self, cik, metric, filings_type, fingerprint, source_version):
+        """
+        Return a stored metric result (serialized text) computed with this formula fingerprint from this source version.
+        """
+        row = self._connection().execute(
+            "SELECT data FROM metric_cache WHERE cik = ? AND metric = ? AND filings_type = ? "
+            "AND fingerprint = ? AND source_version = ?",
+            (cik, metric, filings_type, fingerprint, source_version)
+        ).fetchone()
+        return row[0] if row else None
+
+    def store_metric_result(self, cik, metric, filings_type, fingerprint, source_version, data):
+        """
+        Store a serialized metric result, replacing any result of an older formula or source version.
+        """
+        conn = self._connection()
+        with conn:
+            previous = conn.execute(
+                "SELECT LENGTH(CAST(data AS BLOB)) FROM metric_cache WHERE cik = ? AND metric = ? AND filings_type = ?",
+                (cik, metric, filings_type)
+            ).fetchone()
             conn.execute(
-                "INSERT OR REPLACE INTO sec_cache (cik, data, last_updated) VALUES (?, ?, ?)",
-                (cik, json.dumps(data), time.time())
+                "INSERT OR REPLACE INTO metric_cache (cik, metric, filings_type, fingerprint, source_version, "
+                "data, computed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cik, metric, filings_type, fingerprint, source_version, data, time.time())
+            )
+            # Keep the company's running total so evict never has to scan metric_cache
+            delta = _text_bytes(data) - ((previous[0] or 0) if previous else 0)
+            conn.execute(
+                "UPDATE sec_cache SET metric_bytes = COALESCE(metric_bytes, 0) + ? WHERE cik = ?", (delta, cik)
             )
 
-@cache
-def get_all_cik():
-    url = "https://www.sec.gov/files/company_tickers.json"
+    def store_tickers(self, records):
+        """
+        Replace the ticker lookup table with ``records`` (dicts with ``ticker``, ``cik``, ``name`` and ``exchange``).
+
+        Returns the number of tickers stored.
+        """
+        now = time.time()
+        rows = [
+            (normalize_ticker(record["ticker"]), normalize_cik(record["cik"]), record.get("name"),
+             record.get("exchange"), _name_key(record.get("name") or ""), now)
+            for record in records
+            if record.get("ticker")
+        ]
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM sec_tickers")
+            conn.executemany(
+                "INSERT OR REPLACE INTO sec_tickers (ticker, cik, name, exchange, name_key, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def tickers_fresh(self, max_age_days=None):
+        """
+        Whether the ticker lookup table is populated and younger than ``max_age_days`` (defaults to the cache's).
+        """
+        updated_at = self._connection().execute("SELECT MAX(updated_at) FROM sec_tickers").fetchone()[0]
+        return updated_at is not None and self._is_fresh(updated_at, 0, max_age_days)
+
+    def lookup_ticker(self, ticker):
+        """
+        Return the ``ticker``/``cik``/``name``/``exchange`` record of a ticker (e.g. ``"brk.b"``), or ``None``.
+        """
+        row = self._connection().execute(
+            f"SELECT {_TICKER_COLUMNS} FROM sec_tickers WHERE ticker = ?", (normalize_ticker(ticker),)
+        ).fetchone()
+        return dict(zip(_TICKER_FIELDS, row)) if row else None
+
+    def all_tickers(self):
+        """
+        Return every record of the ticker lookup table, in the order they were stored.
+        """
+        rows = self._connection().execute(f"SELECT {_TICKER_COLUMNS} FROM sec_tickers ORDER BY rowid")
+        return [dict(zip(_TICKER_FIELDS, row)) for row in rows]
+
+    def search_companies(self, query, limit=10, cutoff=0.6):
+        """
+        Search the ticker lookup table by ticker or company name.
+
+        An exact ticker comes first, then names starting with ``query``
+        (an indexed range scan), then, if fewer than ``limit`` were found,
+        names close to it (``difflib`` ratio of at least ``cutoff``).
+        """
+        key = _name_key(query)
+        if not key:
+            return []
+        conn = self._connection()
+        found = {}
+        exact = self.lookup_ticker(query)
+        if exact:
+            found[exact["ticker"]] = exact
+        rows = conn.execute(
+            f"SELECT {_TICKER_COLUMNS} FROM sec_tickers WHERE name_key >= ? AND name_key < ? "
+            "ORDER BY name_key, ticker LIMIT ?", (key, key + "\uffff", limit)
+        )
+        for row in rows:
+            found.setdefault(row[0], dict(zip(_TICKER_FIELDS, row)))
+        if len(found) < limit:
+            by_key = {}
+            for row in conn.execute(f"SELECT {_TICKER_COLUMNS}, name_key FROM sec_tickers"):
+                by_key.setdefault(row[-1], []).append(dict(zip(_TICKER_FIELDS, row[:-1])))
+            for match in difflib.get_close_matches(key, by_key, n=limit, cutoff=cutoff):
+                for record in by_key[match]:
+                    found.setdefault(record["ticker"], record)
+        return list(found.values())[:limit]
+
+    def get_logos(self, slugs, max_age_days=7, negative_max_age_days=1) -> dict:
+        """
+        Return the cached logo checks of some slugs as ``{slug: found}``.
+
+        Found logos are trusted for ``max_age_days`` and missing ones (served
+        as the placeholder) for ``negative_max_age_days``; older checks are omitted.
+        """
+        slugs = list(dict.fromkeys(slugs))
+        conn = self._connection()
+        now = time.time()
+        known = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(slugs), 500):
+            chunk = slugs[start:start + 500]
+            rows = conn.execute(
+                f"SELECT slug, found, checked_at FROM logo_cache WHERE slug IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for slug, found, checked_at in rows:
+                if (now - checked_at) / 86400 <= (max_age_days if found else negative_max_age_days):
+                    known[slug] = bool(found)
+        return known
+
+    def store_logos(self, results):
+        """
+        Record logo checks given as ``{slug: found}``.
+        """
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO logo_cache (slug, found, checked_at) VALUES (?, ?, ?)",
+                ((slug, int(found), now) for slug, found in results.items())
+            )
+
+    def store(self, cik, data, etag=None, last_modified=None):
+        """
+        Store data in the cache for a CIK, with the response validators used for later revalidation.
+
+        ``data`` may be the decoded dict or the raw JSON text/bytes of the
+        response, which is then stored without a decode/encode round-trip.
+        """
+        conn = self._connection()
+        with conn:
+            self._write(conn, cik, data, etag, last_modified)
+        self.evict()
+
+    def ingest_bulk_archive(self, path, batch_size=500, progress=None):
+        """
+        Warm the cache from SEC's nightly ``companyfacts.zip`` bulk archive.
+
+        Members are decoded one at a time (the archive is never extracted to
+        disk) and written ``batch_size`` per transaction. ``progress``, if
+        given, is called as ``progress(processed, total)`` after each batch.
+        Members that cannot be parsed are logged and skipped.
+
+        Returns the number of companies stored.
+        """
+        conn = self._connection()
+        stored = 0
+        with zipfile.ZipFile(path) as archive:
+            members = [info for info in archive.infolist() if info.filename.endswith(".json")]
+            total = len(members)
+            for start in range(0, total, batch_size):
+                batch = members[start:start + batch_size]
+                with conn:
+                    for info in batch:
+                        try:
+                            with archive.open(info) as fh:
+                                data = _json_loads(fh.read())
+                            cik = _archive_member_cik(info.filename, data)
+                        except (ValueError, TypeError, KeyError, zipfile.BadZipFile) as e:
+                            logging.error(f"Skipping bulk archive member {info.filename}: {e}")
+                            continue
+                        self._write(conn, cik, data)
+                        stored += 1
+                self.evict()
+                processed = start + len(batch)
+                logging.info(f"Ingested {processed}/{total} members from {path}")
+                if progress:
+                    progress(processed, total)
+        return stored
+
+    def evict(self, max_entries=None, max_bytes=None):
+        """
+        Drop the least recently used companies until the cache fits its limits.
+
+        Args:
+            max_entries (int): Maximum number of cached companies (defaults to the cache's ``max_entries``).
+            max_bytes (int): Maximum total size of the stored companies (defaults to the cache's ``max_bytes``).
+
+        Returns:
+            The list of evicted CIKs.
+
+        The most recently used company is always kept. Evicted companies also
+        lose their normalized facts and persisted metric results.
+
+        A company's size counts everything stored for it: its compressed
+        payload, the estimated size of its ``sec_facts`` rows (recorded in
+        ``size_bytes`` when written) and its ``metric_cache`` results
+        (totalled in ``metric_bytes`` by ``store_metric_result``). The
+        limit is therefore close to, but not exactly, the database file size,
+        which also holds free pages, the ticker and logo tables and the WAL.
+        """
+        max_entries = self.max_entries if max_entries is None else max_entries
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_entries is None and max_bytes is None:
+            return []
+        conn = self._connection()
+        # Byte totals are only summed when a byte limit applies
+        running_bytes = "0" if max_bytes is None else (
+            "SUM(COALESCE(size_bytes, LENGTH(data)) + COALESCE(metric_bytes, 0)) OVER recency"
+        )
+        rows = conn.execute(f"""
+            SELECT cik FROM (
+                SELECT cik,
+                       ROW_NUMBER() OVER recency AS position,
+                       {running_bytes} AS running_bytes
+                FROM sec_cache
+                WINDOW recency AS (
+                    ORDER BY COALESCE(last_accessed, last_updated) DESC, cik ROWS UNBOUNDED PRECEDING
+                )
+            )
+            WHERE position > 1 AND (position > ? OR running_bytes > ?)
+        """, (
+            math.inf if max_entries is None else max_entries,
+            math.inf if max_bytes is None else max_bytes,
+        )).fetchall()
+        evicted = [row[0] for row in rows]
+        if not evicted:
+            return evicted
+        with conn:
+            for table in ("sec_cache", "sec_facts", "metric_cache"):
+                conn.executemany(f"DELETE FROM {table} WHERE cik = ?", ((cik,) for cik in evicted))
+        if self._memory is not None:
+            self._memory.discard(evicted)
+        logging.info(f"Evicted {len(evicted)} companies from {self.db_path}")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == _AUTO_VACUUM_INCREMENTAL:
+            self.vacuum()
+        return evicted
+
+    def vacuum(self, pages=None):
+        """
+        Return free database pages to the filesystem.
+
+        Databases created by this class use ``auto_vacuum=INCREMENTAL``, so
+        this releases up to ``pages`` free pages (all of them by default)
+        without rewriting the file. Older databases are converted with a
+        one-off full ``VACUUM``.
+
+        Returns the number of pages released.
+        """
+        conn = self._connection()
+        before = conn.execute("PRAGMA page_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != _AUTO_VACUUM_INCREMENTAL:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            # incremental_vacuum frees one page per step: executescript runs it to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages or 0)})")
+        return before - conn.execute("PRAGMA page_count").fetchone()[0]
+
+    def _write(self, conn, cik, data, etag=None, last_modified=None):
+        is_raw = isinstance(data, (str, bytes))
+        # Raw response bodies are already JSON: keep them as-is rather than re-encoding
+        encoded, codec = (data, "json") if is_raw else _encode_document(data, self.codec)
+        payload, version = _compress_payload(encoded, self.compression)
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO sec_cache (cik, data, last_updated, facts_indexed, version, etag, "
+            "last_modified, stored_at, stale, codec, last_accessed, size_bytes, metric_bytes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, "
+            "COALESCE((SELECT metric_bytes FROM sec_cache WHERE cik = ?), 0))",
+            (cik, payload, now, int(self.normalized), version, etag, last_modified, now, codec, now,
+             _text_bytes(payload), cik)
+        )
+        if self._memory is not None:
+            self._memory.discard([cik])
+        # Always drop the previous rows so the facts table never outlives its document
+        conn.execute("DELETE FROM sec_facts WHERE cik = ?", (cik,))
+        if self.normalized:
+            rows = list(_iter_fact_rows(cik, _json_loads(data) if is_raw else data))
+            conn.executemany(
+                "INSERT INTO sec_facts (cik, taxonomy, tag, unit, form, fy, fp, period_start, "
+                "period_end, filed, accn, frame, val) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            # Charge the normalized rows to the company so max_bytes bounds them too
+            conn.execute(
+                "UPDATE sec_cache SET size_bytes = size_bytes + ? WHERE cik = ?",
+                (sum(_fact_row_bytes(row) for row in rows), cik)
+            )
+
+
+class _MemoryTier:
+    """
+    Thread-safe LRU of parsed documents keyed by CIK, bounded by the total estimated size of its entries.
+
+    Each entry remembers the source version (``stored_at``) it was decoded
+    from and is only served while the database row still has that version.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, cik, version):
+        with self._lock:
+            entry = self._entries.get(cik)
+            if entry is not None and version is not None and entry[0] == version:
+                self._entries.move_to_end(cik)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._pop(cik)
+            self.misses += 1
+            return None
+
+    def put(self, cik, version, document, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if cik in self._entries:
+                self._pop(cik)
+            self._entries[cik] = (version, document, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def discard(self, ciks):
+        with self._lock:
+            for cik in ciks:
+                if cik in self._entries:
+                    self._pop(cik)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
+
+    def _pop(self, cik):
+        self._bytes -= self._entries.pop(cik)[2]
+
+
+def _select_facts(document, tags, taxonomies):
+    """
+    Restrict an already-decoded document to some tags/taxonomies without modifying it.
+    """
+    if not (tags or taxonomies):
+        return document
+    return _prune_facts(dict(document), set(tags or ()) or None, set(taxonomies or ()) or None)
+
+
+def _archive_member_cik(filename, data):
+    """
+    Derive the cache key of a bulk archive member (``CIK0000320193.json``), falling back to its ``cik`` field.
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    digits = stem[3:] if stem.upper().startswith("CIK") else stem
+    if not digits.isdigit():
+        digits = str(int(data["cik"]))
+    return f"CIK{digits.zfill(10)}"
+
+
+# Words dropped from company names when building logo slugs
+_LOGO_STOP_WORDS = re.compile(
+    r'\b(the|company|group|corp\.?|corporation|inc\.?|incorporated|ltd\.?|plc|laboratories|communications|new|motor|ag|\.com)\b'
+)
+_LOGO_UNWANTED_CHARS = re.compile(r"[^a-z0-9\s-]")
+
+# Columns of the records returned by the ticker lookups
+_TICKER_FIELDS = ("ticker", "cik", "name", "exchange")
+_TICKER_COLUMNS = ", ".join(_TICKER_FIELDS)
+
+# Reads refresh sec_cache.last_accessed at most this often per company
+_ACCESS_RESOLUTION_SECONDS = 60
+
+# Value of PRAGMA auto_vacuum for incremental mode
+_AUTO_VACUUM_INCREMENTAL = 2
+
+# Storage formats recorded in sec_cache.version
+_FORMAT_JSON = 0
+_FORMAT_ZLIB = 1
+_FORMAT_ZSTD = 2
+
+_COMPRESSION_FORMATS = {None: _FORMAT_JSON, "zlib": _FORMAT_ZLIB, "zstd": _FORMAT_ZSTD}
+
+
+def _import_zstandard():
     try:
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        df = pd.DataFrame.from_dict(data, orient='index')
-        df.rename(columns={"cik_str": "cik", "title": "NAME"}, inplace=True)
-        df["cik"] = df["cik"].apply(lambda x: f"CIK{int(x):010d}")
-        return df
-    except Exception as e:
-        logging.error(f"Failed to fetch CIK data: {e}")
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "zstd compression requires the optional 'zstandard' package: pip install zstandard"
+        ) from exc
+    return zstandard
+
+
+# Serializers recorded in sec_cache.codec; "json" and "orjson" rows are both JSON text
+_CODECS = ("json", "orjson", "msgpack")
+# Ratio of a parsed document's deep size (dicts, lists, strings and numbers)
+# to its decoded payload, measured on companyfacts documents. orjson does not
+# intern repeated keys and msgpack payloads are more compact than JSON.
+_PARSED_SIZE_FACTORS = {"json": 4, "orjson": 4.5, "msgpack": 6}
+
+
+def _import_orjson():
+    """
+    Return the optional ``orjson`` module, or ``None`` when it is not installed.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ImportError(
+            "the msgpack codec requires the optional 'msgpack' package: pip install msgpack"
+        ) from exc
+    return msgpack
+
+
+def _resolve_codec(codec):
+    """
+    Validate a codec name, resolving ``"auto"`` to orjson when installed and stdlib json otherwise.
+    """
+    if codec == "auto":
+        return "orjson" if _import_orjson() is not None else "json"
+    if codec not in _CODECS:
+        raise ValueError(f"Unsupported codec {codec!r}, expected 'auto' or one of {list(_CODECS)}")
+    if codec == "orjson" and _import_orjson() is None:
+        raise ImportError("the orjson codec requires the optional 'orjson' package: pip install orjson")
+    if codec == "msgpack":
+        _import_msgpack()
+    return codec
+
+
+def _encode_document(data, codec):
+    """
+    Serialize a document, returning the payload and the codec actually used.
+
+    Documents the fast codecs cannot represent (e.g. integers beyond 64 bits)
+    fall back to stdlib json.
+    """
+    if codec == "orjson":
+        try:
+            return _import_orjson().dumps(data), "orjson"
+        except TypeError:
+            pass
+    elif codec == "msgpack":
+        try:
+            return _import_msgpack().packb(data, use_bin_type=True), "msgpack"
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return json.dumps(data), "json"
+
+
+def _decode_document(payload, codec):
+    """
+    Deserialize a payload written with ``codec`` (``None`` for rows older than the codec column).
+    """
+    if codec == "msgpack":
+        return _import_msgpack().unpackb(payload, raw=False, strict_map_key=False)
+    return _json_loads(payload)
+
+
+def _json_loads(text):
+    """
+    Decode JSON text or bytes, with orjson when it is installed.
+    """
+    orjson = _import_orjson()
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _compress_payload(text, compression):
+    """
+    Encode a JSON document for storage, returning the payload and its format version.
+    """
+    if compression is None:
+        return text, _FORMAT_JSON
+    raw = text.encode("utf-8") if isinstance(text, str) else text
+    if compression == "zlib":
+        return zlib.compress(raw), _FORMAT_ZLIB
+    return _import_zstandard().ZstdCompressor().compress(raw), _FORMAT_ZSTD
+
+
+def _decompress_payload(payload, version):
+    """
+    Return the JSON text (or bytes) of a stored payload according to its format version.
+    """
+    if not version:
+        return payload
+    if version == _FORMAT_ZLIB:
+        return zlib.decompress(payload)
+    if version == _FORMAT_ZSTD:
+        return _import_zstandard().ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown SECCache storage format version {version}")
+
+
+def _import_ijson():
+    """
+    Return the optional ``ijson`` streaming parser, or ``None`` when it is not installed.
+    """
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+def extract_facts(source, tags=None, taxonomies=None) -> dict:
+    """
+    Extract selected facts from a companyfacts JSON document.
+
+    Args:
+        source: JSON text, bytes or a binary file-like object.
+        tags (iterable): Tags to keep (all when ``None``).
+        taxonomies (iterable): Taxonomies to keep, e.g. ``["us-gaap"]`` (all when ``None``).
+
+    Returns:
+        The document with its ``facts`` restricted to the requested taxonomies/tags.
+
+    When ``ijson`` is installed the document is parsed as an event stream
+    and unwanted facts are skipped without ever being built, which keeps
+    peak memory close to the size of the selection. Otherwise the document
+    is decoded with ``json`` and pruned.
+    """
+    tags = set(tags) if tags else None
+    taxonomies = set(taxonomies) if taxonomies else None
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    ijson = _import_ijson()
+    if ijson is None:
+        return _prune_facts(_json_loads(source.read()), tags, taxonomies)
+
+    events = ijson.parse(source, use_float=True)
+    document = {}
+    next(events)  # start of the root object
+    for _, event, key in events:
+        if event != "map_key":
+            break
+        if key != "facts":
+            document[key] = _build_json_value(ijson, events)
+            continue
+        document["facts"] = {}
+        next(events)  # start of the facts object
+        for _, event, taxonomy in events:
+            if event != "map_key":
+                break
+            if taxonomies is not None and taxonomy not in taxonomies:
+                _build_json_value(None, events)
+                continue
+            selected = document["facts"][taxonomy] = {}
+            next(events)  # start of the taxonomy object
+            for _, event, tag in events:
+                if event != "map_key":
+                    break
+                wanted = tags is None or tag in tags
+                value = _build_json_value(ijson if wanted else None, events)
+                if wanted:
+                    selected[tag] = value
+    return document
+
+
+def _build_json_value(ijson, events):
+    """
+    Consume the events of the next JSON value, building it unless ``ijson`` is ``None`` (skip).
+    """
+    builder = ijson.ObjectBuilder() if ijson is not None else None
+    depth = 0
+    for _, event, value in events:
+        if builder is not None:
+            builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            return builder.value if builder is not None else None
+
+
+def _prune_facts(document, tags, taxonomies) -> dict:
+    facts = document.get("facts")
+    if not isinstance(facts, dict):
+        return document
+    document["facts"] = {
+        taxonomy: {tag: value for tag, value in tag_data.items() if tags is None or tag in tags}
+        for taxonomy, tag_data in facts.items()
+        if (taxonomies is None or taxonomy in taxonomies) and isinstance(tag_data, dict)
+    }
+    return document
+
+
+# Keys of the entries returned by SECCache.get_fact_entries, mirroring the companyfacts JSON
+_FACT_ENTRY_FIELDS = ("val", "start", "end", "filed", "form", "fy", "fp", "accn", "frame")
+# Positions of cik, tag, form, period_end and filed (the idx_sec_facts_lookup columns) in a sec_facts row
+_FACT_INDEX_POSITIONS = (0, 2, 4, 8, 9)
+# Rowid, record header and index entry overhead of one sec_facts row
+_FACT_ROW_OVERHEAD_BYTES = 20
+
+
+def _ensure_column(conn, table, column, declaration):
+    """
+    Add a column to an existing table if it is missing (lightweight schema migration).
+
+    Returns True when the column was added.
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column in existing:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    return True
+
+
+def _text_bytes(value):
+    """
+    Return the stored size of a TEXT or BLOB value.
+    """
+    if value is None:
+        return 0
+    return len(value.encode("utf-8") if isinstance(value, str) else value)
+
+
+def _iter_fact_rows(cik, data):
+    """
+    Flatten a companyfacts payload into ``sec_facts`` rows.
+    """
+    facts = data.get("facts", {}) if isinstance(data, dict) else {}
+    for taxonomy, tags in facts.items():
+        if not isinstance(tags, dict):
+            continue
+        for tag, tag_data in tags.items():
+            for unit, entries in tag_data.get("units", {}).items():
+                for entry in entries:
+                    yield (
+                        cik, taxonomy, tag, unit, entry.get("form"), entry.get("fy"), entry.get("fp"),
+                        entry.get("start"), entry.get("end"), entry.get("filed"), entry.get("accn"),
+                        entry.get("frame"), entry.get("val"),
+                    )
+
+
+def _fact_row_bytes(row):
+    """
+    Estimate the stored size of one ``sec_facts`` row.
+
+    A row is charged its field sizes, the fields repeated in the lookup index
+    and a fixed per-row overhead (measured at about 175 bytes per fact on
+    SEC payloads, within a few percent of the actual page usage).
+    """
+    return _FACT_ROW_OVERHEAD_BYTES + sum(_field_bytes(value) for value in row) + sum(
+        _field_bytes(row[position]) for position in _FACT_INDEX_POSITIONS
+    )
+
+
+def _field_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    return 8
+
+
+def get_all_cik(cache: SECCache = None):
+    """
+    Return the SEC ticker list as a DataFrame with ``cik``, ``ticker``, ``NAME`` and ``exchange`` columns.
+
+    The list is read from the cache's ticker table (``sec_tickers``), which
+    is only re-downloaded once stale (see ``refresh_tickers``), so it is not
+    fetched again on every process start. Without a cache the default
+    ``SECCache()`` database is used. A failed download is logged and the
+    stored copy returned, or an empty DataFrame when there is none.
+    """
+    import pandas as pd
+
+    cache = _default_cache() if cache is None else cache
+    _refresh_tickers_or_log(cache)
+    records = cache.all_tickers()
+    if not records:
         return pd.DataFrame()
+    df = pd.DataFrame.from_records(records, columns=_TICKER_FIELDS)
+    return df.rename(columns={"name": "NAME"})[["cik", "ticker", "NAME", "exchange"]]
+
+
+@cache
+def _default_cache() -> SECCache:
+    return SECCache()
 
 
 def create_spark_line(data, _height: int = 100, _width: int = 250):
     """
     Creates and shows a Plotly sparkline for the given data.
     """
+    return _sparkline_figure(data, _height, _width).show()
+
+
+def _sparkline_figure(data, height, width, color="#32CD32"):
+    import pandas as pd
+    import plotly.express as px
+
     if isinstance(data, pd.DataFrame):
         df = data
     else:
         df = pd.DataFrame(data)
 
-    fig = px.area(df, height=_height, width=_width)
+    fig = px.area(df, height=height, width=width)
 
     # hide and lock down axes
     fig.update_xaxes(visible=False, fixedrange=True)
@@ -94,64 +1126,336 @@ def create_spark_line(data, _height: int = 100, _width: int = 250):
         showlegend=False,
         plot_bgcolor="white",
         margin=dict(t=10, l=10, b=10, r=10))
-    fig.update_traces(line_color="#32CD32")
+    fig.update_traces(line_color=color)
+    return fig
 
-    return fig.show()
 
+def render_sparklines(data, width: int = 250, height: int = 100, color: str = "#32CD32", fill: bool = True,
+                      stroke_width: float = 1.5, backend: str = "svg") -> dict:
+    """
+    Render many sparklines at once as inline HTML strings, without opening a viewer.
+
+    Args:
+        data: A DataFrame (one sparkline per column, e.g. a ``Date x company``
+            panel), a dict of array-likes, or any iterable of array-likes
+            (Series, lists, NumPy arrays; a 2-D array gives one per row).
+            Use ``render_sparkline`` for a single series.
+        width, height (int): Size of each sparkline in pixels.
+        color (str): Line (and area) color.
+        fill (bool): Shade the area under the line, like ``create_spark_line``.
+        stroke_width (float): Line width in pixels.
+        backend (str): ``"svg"`` builds lightweight ``<svg>`` elements
+            directly from the values with NumPy; ``"plotly"`` renders each
+            sparkline with Plotly as an HTML fragment (the page must load
+            plotly.js itself).
 
-def get_company_logo_url(name):
+    Returns:
+        A dict of HTML strings keyed by column (DataFrame), key (dict) or
+        position (other iterables). Points are evenly spaced; missing values
+        are skipped, and series with fewer than two points render as an
+        empty sparkline.
+
+    Raises:
+        TypeError: If ``data`` is a single series (a Series, a 1-D array or
+            a list of numbers) rather than a collection of them.
+    """
+    import numpy as np
+    import pandas as pd
+
+    _check_sparkline_backend(backend)
+    if isinstance(data, pd.DataFrame):
+        data = {column: data[column] for column in data.columns}
+    elif isinstance(data, (pd.Series, pd.Index)) or (isinstance(data, np.ndarray) and data.ndim < 2):
+        raise TypeError("render_sparklines expects a collection of series, use render_sparkline for a single one")
+    elif not isinstance(data, dict):
+        data = dict(enumerate(data))
+
+    rendered = {}
+    for key, values in data.items():
+        if np.ndim(values) == 0:
+            raise TypeError(f"Sparkline {key!r} is a scalar: use render_sparkline for a single series")
+        rendered[key] = render_sparkline(values, width, height, color, fill, stroke_width, backend)
+    return rendered
+
+
+def render_sparkline(values, width: int = 250, height: int = 100, color: str = "#32CD32", fill: bool = True,
+                     stroke_width: float = 1.5, backend: str = "svg") -> str:
+    """
+    Render one sparkline (a Series, list or NumPy array) as an inline HTML string.
+
+    Takes the same options as ``render_sparklines``.
+    """
+    _check_sparkline_backend(backend)
+    if backend == "plotly":
+        import pandas as pd
+
+        figure = _sparkline_figure(pd.Series(values, dtype=float).dropna().reset_index(drop=True), height, width, color)
+        return figure.to_html(full_html=False, include_plotlyjs=False)
+    return _sparkline_svg(values, width, height, color, fill, stroke_width)
+
+
+def _check_sparkline_backend(backend):
+    if backend not in ("svg", "plotly"):
+        raise ValueError(f"Unsupported backend {backend!r}, expected 'svg' or 'plotly'")
+
+
+def _sparkline_svg(values, width, height, color, fill, stroke_width) -> str:
+    from html import escape
+
+    import numpy as np
+
+    color = escape(color, quote=True)
+    y = np.asarray(values, dtype=float).ravel()
+    y = y[np.isfinite(y)]
+    header = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" preserveAspectRatio="none">'
+    )
+    if y.size < 2:
+        return header + "</svg>"
+
+    pad = stroke_width
+    x = np.linspace(pad, width - pad, y.size)
+    low, high = y.min(), y.max()
+    if high > low:
+        y = pad + (high - y) / (high - low) * (height - 2 * pad)
+    else:
+        y = np.full(y.size, height / 2)
+    points = " ".join(f"{px:.1f},{py:.1f}" for px, py in zip(x, y))
+    area = ""
+    if fill:
+        area = (
+            f'<polygon points="{x[0]:.1f},{height} {points} {x[-1]:.1f},{height}" '
+            f'fill="{color}" fill-opacity="0.3" stroke="none"/>'
+        )
+    line = (
+        f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="{stroke_width}" '
+        'stroke-linejoin="round" stroke-linecap="round"/>'
+    )
+    return f"{header}{area}{line}</svg>"
+
+
+def get_company_logo_url(name, cache: SECCache = None):
     """
     Generate a TradingView logo URL for a given company name.
     Falls back to a placeholder if the logo does not exist.
+
+    With a cache, the outcome of the check is stored (see ``SECCache.get_logos``);
+    use ``fetch_logo_urls`` to resolve many names concurrently.
     """
+    import requests
 
-    base_url = 'https://s3-symbol-logo.tradingview.com/'
-    # Normalize name: lowercase, remove unwanted words, punctuation, and extra spaces
-    name = name.lower()
-    name = re.sub(r'\b(the|company|group|corp\.?|corporation|inc\.?|incorporated|ltd\.?|plc|laboratories|communications|new|motor|ag|\.com)\b', '', name)
-    name = re.sub(r'[&]', 'and', name)
-    name = re.sub(r"[^a-z0-9\s-]", '', name)
-    name = re.sub(r'\s+', ' ', name).strip()
-    clean_name = '-'.join(name.split())
-    logo_url = f"{base_url}{clean_name}--big.svg"
+    slug = logo_slug(name)
+    if not slug:
+        return LOGO_PLACEHOLDER_URL
+    known = cache.get_logos([slug]) if cache else {}
+    if slug in known:
+        return logo_url(slug) if known[slug] else LOGO_PLACEHOLDER_URL
     try:
         # Using a browser-like User-Agent for logos might be better
-        logo_headers = {'User-Agent': 'Mozilla/5.0'}
-        resp = requests.head(logo_url, headers=logo_headers, timeout=2)
-        if resp.status_code == 200:
-            return logo_url
+        resp = requests.head(logo_url(slug), headers=LOGO_HEADERS, timeout=2)
     except Exception:
-        pass
-    return "https://placehold.co/600x400?text=Logo"
+        return LOGO_PLACEHOLDER_URL
+    if cache and resp.status_code < 500:
+        cache.store_logos({slug: resp.status_code == 200})
+    return logo_url(slug) if resp.status_code == 200 else LOGO_PLACEHOLDER_URL
 
 
-def request_company_filing(cik: str, cache: SECCache = None) -> dict:
+def logo_slug(name) -> str:
     """
-    Fetch company facts from SEC EDGAR API for a given CIK.
+    Normalize a company name into its TradingView logo slug: lowercase, without legal suffixes, punctuation or extra spaces.
+    """
+    name = _LOGO_STOP_WORDS.sub('', name.lower())
+    name = name.replace('&', 'and')
+    name = _LOGO_UNWANTED_CHARS.sub('', name)
+    return '-'.join(name.split())
+
+
+def logo_url(slug) -> str:
+    return f"{LOGO_BASE_URL}{slug}--big.svg"
+
+
+def normalize_cik(cik) -> str:
+    """
+    Format a CIK (int, unpadded or padded string) as the ``CIK##########`` cache key.
     """
-    # Ensure CIK is correctly formatted
     cik_str = str(cik).zfill(10)
     if not cik_str.startswith("CIK"):
         cik_str = f"CIK{cik_str}"
-        
+    return cik_str
+
+
+def normalize_ticker(ticker) -> str:
+    """
+    Format a ticker as listed by the SEC: upper case, with ``-`` as the share class separator (``BRK.B`` -> ``BRK-B``).
+    """
+    return str(ticker).strip().upper().replace(".", "-").replace("/", "-")
+
+
+def _name_key(name) -> str:
+    """
+    Case- and punctuation-insensitive form of a company name used for searches.
+    """
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(name).lower()).split())
+
+
+def parse_company_tickers(data) -> list:
+    """
+    Turn SEC's ``company_tickers_exchange.json`` (or the plainer ``company_tickers.json``) into lookup records.
+    """
+    if "fields" in data:
+        fields = data["fields"]
+        records = [dict(zip(fields, row)) for row in data["data"]]
+    else:
+        records = [{"cik": entry["cik_str"], "name": entry.get("title"), "ticker": entry["ticker"]}
+                   for entry in data.values()]
+    return [
+        {"ticker": record["ticker"], "cik": normalize_cik(record["cik"]),
+         "name": record.get("name"), "exchange": record.get("exchange")}
+        for record in records
+        if record.get("ticker")
+    ]
+
+
+def download_company_tickers() -> list:
+    """
+    Download the SEC ticker list as lookup records (see ``parse_company_tickers``).
+    """
+    response = _timed_get(COMPANY_TICKERS_URL, headers=DEFAULT_HEADERS)
+    response.raise_for_status()
+    return parse_company_tickers(response.json())
+
+
+def refresh_tickers(cache: SECCache, max_age_days=None, force=False) -> int:
+    """
+    Download the SEC ticker list into the cache's lookup table unless it is already fresh.
+
+    Returns the number of tickers stored (0 when the table was fresh).
+    """
+    if not force and cache.tickers_fresh(max_age_days):
+        return 0
+    return cache.store_tickers(download_company_tickers())
+
+
+def resolve_ticker(ticker, cache: SECCache = None):
+    """
+    Return the ``ticker``/``cik``/``name``/``exchange`` record of a ticker, or ``None`` if the SEC does not list it.
+
+    With a cache the ticker list is persisted in its database and only
+    re-downloaded once stale; without one it is downloaded once per process.
+    If the download fails, a stale persisted list is used instead and the
+    error is logged (``None`` is returned when no list is available).
+    """
+    if cache is None:
+        try:
+            return _company_tickers_by_symbol().get(normalize_ticker(ticker))
+        except Exception as e:
+            logging.error(f"Failed to fetch the SEC ticker list: {e}")
+            return None
+    _refresh_tickers_or_log(cache)
+    return cache.lookup_ticker(ticker)
+
+
+def _refresh_tickers_or_log(cache: SECCache):
+    """
+    Refresh the cache's ticker table when stale, logging a failed download instead of raising.
+    """
+    try:
+        refresh_tickers(cache)
+    except Exception as e:
+        if cache.tickers_fresh(max_age_days=math.inf):
+            logging.error(f"Failed to refresh the SEC ticker list, using the stored copy: {e}")
+        else:
+            logging.error(f"Failed to fetch the SEC ticker list: {e}")
+
+
+@cache
+def _company_tickers_by_symbol() -> dict:
+    return {normalize_ticker(record["ticker"]): record for record in download_company_tickers()}
+
+
+def request_company_filing(cik: str, cache: SECCache = None, tags=None, taxonomies=None) -> dict:
+    """
+    Fetch company facts from SEC EDGAR API for a given CIK.
+
+    When the cached copy has expired, the request is made conditional on the
+    stored ``ETag``/``Last-Modified`` validators; a ``304 Not Modified``
+    answer only refreshes the entry's timestamp instead of re-downloading it.
+
+    With ``tags`` and/or ``taxonomies`` only those facts are returned (see
+    ``extract_facts``); the full response is still stored in the cache.
+    """
+    cik_str = normalize_cik(cik)
+    selective = bool(tags or taxonomies)
+
+    validators = {}
     if cache:
-        cached_data = cache.get(cik_str)
+        cached_data = cache.get(cik_str, tags=tags, taxonomies=taxonomies)
         if cached_data:
             return cached_data
-            
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/{cik_str}.json"
+        validators = cache.get_validators(cik_str)
+
+    url = COMPANY_FACTS_URL.format(cik=cik_str)
     try:
-        response = requests.get(url, headers=DEFAULT_HEADERS, timeout=10)
+        response = _timed_get(url, headers={**DEFAULT_HEADERS, **conditional_headers(validators)})
+        if response.status_code == 304 and cache:
+            cache.touch(cik_str)
+            cached_data = cache.get(cik_str, max_age_days=math.inf, tags=tags, taxonomies=taxonomies)
+            if cached_data is not None:
+                return cached_data
+            # The entry vanished between the two reads: download it unconditionally
+            response = _timed_get(url, headers=DEFAULT_HEADERS)
         response.raise_for_status()
-        data = response.json()
+        if selective:
+            # Keep the raw bytes: they are cached as-is and only the selection is decoded
+            data = response.content
+            if cache:
+                cache.store(cik_str, data, **response_validators(response.headers))
+            with telemetry.timer("http.decode"):
+                return extract_facts(data, tags=tags, taxonomies=taxonomies)
+        with telemetry.timer("http.decode"):
+            data = response.json()
         if cache:
-            cache.store(cik_str, data)
+            cache.store(cik_str, data, **response_validators(response.headers))
         return data
     except Exception as e:
         logging.error(f"Failed to fetch filing data for {cik_str}: {e}")
         return {}
 
-def calculate_cagr(df: pd.Series, periods: int):
+
+def _timed_get(url, headers):
+    """
+    ``requests.get`` reporting its latency and response size to the instrumentation.
+    """
+    import requests
+
+    with telemetry.timer("http.request", client="requests") as attributes:
+        response = requests.get(url, headers=headers, timeout=10)
+        attributes["status"] = response.status_code
+    telemetry.increment("http.bytes", len(response.content), client="requests")
+    return response
+
+
+def conditional_headers(validators: dict) -> dict:
+    """
+    Build the ``If-None-Match``/``If-Modified-Since`` headers for stored validators.
+    """
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def response_validators(headers) -> dict:
+    """
+    Extract the validators worth storing from HTTP response headers.
+    """
+    return {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+
+
+def calculate_cagr(df: "pd.Series", periods: int):
     """
     Calculate the Compound Annual Growth Rate over the given number of periods.
     """
@@ -169,6 +1473,116 @@ def calculate_cagr(df: pd.Series, periods: int):
     return round(cagr * 100, 2)
 
 
+def rolling_cagr(data, years: float = 5, tolerance_days: int = 45):
+    """
+    Vectorized, date-aware rolling CAGR (in percent, like ``calculate_cagr``).
+
+    Args:
+        data: A Series indexed by date, or a ``Date x company`` DataFrame
+            (e.g. the output of ``MetricEngine.calculate_panel``).
+        years (float): Length of the growth window.
+        tolerance_days (int): How far from exactly ``years`` before each
+            date the starting observation may be.
+
+    Returns:
+        The same shape as ``data``: for each observation, the growth from the
+        observation closest to ``years`` earlier, annualized over the actual
+        elapsed time. Periods are counted from the dates, not the rows, so
+        gaps and mixed reporting frequencies are handled. Windows without a
+        starting observation or with a non-positive endpoint are NaN, and an
+        empty input gives an all-NaN result.
+
+    Raises:
+        ValueError: If the index contains duplicate dates.
+    """
+    import pandas as pd
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    long = _cagr_long(frame, years, tolerance_days)
+    index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+    if long.empty:
+        result = pd.DataFrame(float("nan"), index=index, columns=range(len(frame.columns)))
+    else:
+        result = long.pivot(index="end", columns="position", values="cagr").reindex(
+            index=index, columns=range(len(frame.columns))
+        )
+    result.index.name = frame.index.name
+    result.columns = frame.columns
+    if isinstance(data, pd.Series):
+        return result.iloc[:, 0].rename(data.name)
+    return result
+
+
+def cross_sectional_cagr(panel, years: float = 5, as_of=None, tolerance_days: int = 45):
+    """
+    CAGR (in percent) of every company of a ``Date x company`` panel over the ``years`` ending at its latest observation.
+
+    With ``as_of``, only observations up to that date are considered. See
+    ``rolling_cagr`` for how the starting observation is chosen. Returns a
+    Series indexed by company, NaN where no CAGR can be computed (all NaN
+    for an empty panel).
+
+    Usage:
+        ranking = cross_sectional_cagr(revenue_panel, years=5).sort_values(ascending=False)
+    """
+    import pandas as pd
+
+    long = _cagr_long(panel, years, tolerance_days)
+    if as_of is not None:
+        long = long[long["end"] <= pd.Timestamp(as_of)]
+    latest = long.sort_values("end").groupby("position", sort=False).tail(1)
+    result = latest.set_index("position")["cagr"].reindex(range(len(panel.columns)))
+    result.index = panel.columns
+    return result.rename("cagr")
+
+
+def _cagr_long(frame, years, tolerance_days):
+    """
+    Pair every observation of a ``Date x company`` frame with the one closest to ``years`` earlier.
+
+    Companies are identified by their column ``position``, so any label type works. Returns a long frame
+    with ``position``, ``end``, ``end_value``, ``start``, ``start_value`` and ``cagr`` columns.
+    """
+    import pandas as pd
+
+    values = frame.copy()
+    values.index = pd.DatetimeIndex(pd.to_datetime(values.index))
+    if values.index.has_duplicates:
+        duplicated = values.index[values.index.duplicated()].unique()
+        raise ValueError(f"CAGR needs one observation per date, found duplicates: {list(duplicated[:5])}")
+    values.index.name = "end"
+    values.columns = pd.Index(range(len(values.columns)))
+    long = (
+        values.reset_index()
+        .melt(id_vars="end", var_name="position", value_name="end_value")
+        .dropna(subset=["end_value"])
+    )
+    long["position"] = long["position"].astype(int)
+    long["end_value"] = long["end_value"].astype(float)
+    # Keep the index resolution (s, ms, us, ns): merge_asof rejects keys of different units
+    long["target"] = (long["end"] - pd.Timedelta(days=years * 365.25)).astype(long["end"].dtype)
+    if long.empty:
+        return long.drop(columns="target").assign(start=long["end"], start_value=long["end_value"],
+                                                  cagr=long["end_value"])
+    starts = long[["position", "end", "end_value"]].rename(columns={"end": "start", "end_value": "start_value"})
+    pairs = pd.merge_asof(
+        long.sort_values("target"),
+        starts.sort_values("start"),
+        left_on="target",
+        right_on="start",
+        by="position",
+        direction="nearest",
+        tolerance=pd.Timedelta(days=tolerance_days),
+    )
+    # Calendar time, so that e.g. two Dec 31 year-ends are exactly one year apart
+    end, start = pairs["end"].dt, pairs["start"].dt
+    elapsed = (end.year - start.year) + (end.month - start.month) / 12 + (end.day - start.day) / 365.25
+    valid = (pairs["start_value"] > 0) & (pairs["end_value"] > 0) & (elapsed > 0)
+    growth = pairs["end_value"].where(valid) / pairs["start_value"].where(valid)
+    pairs["cagr"] = (growth ** (1 / elapsed.where(valid)) - 1) * 100
+    return pairs.drop(columns="target")
+
+
 if __name__ == "__main__":
     print(get_all_cik().head())
     response = request_company_filing("0000320193")
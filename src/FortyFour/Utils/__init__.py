@@ -1,7 +1,20 @@
-from .aws import read_file_from_s3, upload_to_s3
-from .cli_generator import OpenAPICLIGenerator
-from .helpers import remove_nan_values_from_dict, serialize_date_in_dict
-from .search import apply_fuzzy_search, fuzzy_match, fuzzy_similarity
+import importlib
+
+# Public name -> submodule defining it. Submodules are imported on first access, so
+# importing ``FortyFour.Utils`` does not load boto3, httpx, numpy or SQLAlchemy.
+_LAZY_EXPORTS = {
+    "OpenAPICLIGenerator": "cli_generator",
+    "PaginationDep": "pagination",
+    "PaginationParams": "pagination",
+    "apply_fuzzy_search": "search",
+    "fuzzy_match": "search",
+    "fuzzy_similarity": "search",
+    "pagination": "pagination",
+    "read_file_from_s3": "aws",
+    "remove_nan_values_from_dict": "helpers",
+    "serialize_date_in_dict": "helpers",
+    "upload_to_s3": "aws",
+}
 
 __all__ = [
     "OpenAPICLIGenerator",
@@ -20,22 +33,28 @@ __all__ = [
 
 def __getattr__(name: str):
     """
-    Lazily resolve pagination helpers so FastAPI stays an optional dependency.
+    Lazily resolve the package exports, importing their submodule on first use.
 
-    Importing ``FortyFour.Utils`` never requires FastAPI; the pagination
-    symbols are only fetched (and FastAPI imported) when actually used.
+    This keeps optional or heavy dependencies (FastAPI for pagination, boto3
+    for the S3 helpers) out of ``import FortyFour.Utils``; they are only
+    imported when one of their symbols is actually used.
 
     Uses ``importlib.import_module`` rather than ``from . import pagination``:
     the latter re-enters this ``__getattr__`` through the import machinery's
     ``hasattr`` check and recurses. The import system also attaches the
-    submodule to this package as ``FortyFour.Utils.pagination`` — it is
-    overwritten so the ``pagination`` *function* stays the package-level
-    export, matching investos' API surface.
+    submodule to this package as ``FortyFour.Utils.pagination`` — every
+    export of the submodule is then bound over it, so the ``pagination``
+    *function* stays the package-level export, matching investos' API surface.
     """
-    if name in {"PaginationParams", "pagination", "PaginationDep"}:
-        import importlib
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    for export, owner in _LAZY_EXPORTS.items():
+        if owner == module_name:
+            globals()[export] = getattr(module, export)
+    return globals()[name]
+
 
-        _pagination_module = importlib.import_module(".pagination", __name__)
-        globals()["pagination"] = _pagination_module.pagination
-        return getattr(_pagination_module, name)
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
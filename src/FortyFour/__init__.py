@@ -1,3 +1,20 @@
-from .Utils import apply_fuzzy_search
+import importlib
 
 __all__ = ["apply_fuzzy_search"]
+
+# Subpackages reachable as attributes of ``FortyFour`` (``FortyFour.Utils`` was bound by the eager import)
+_SUBPACKAGES = ("Finance", "Utils")
+
+
+def __getattr__(name: str):
+    """
+    Resolve the top-level exports on first use so ``import FortyFour`` stays free of heavy dependencies.
+    """
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f".{name}", __name__)
+    if name == "apply_fuzzy_search":
+        from .Utils import apply_fuzzy_search
+
+        globals()[name] = apply_fuzzy_search
+        return apply_fuzzy_search
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
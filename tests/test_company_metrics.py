@@ -1,4 +1,6 @@
 import pandas as pd
+from pandas import concat, to_numeric
+import time
 import pytest
 import os
 import sys
@@ -39,6 +41,7 @@ def test_company_get_raw_fact():
     assert rev_series.iloc[0] == 100
     assert rev_series.index[0] == pd.to_datetime("2023-01-01")
     
+    cache.close()
     if os.path.exists(db_path):
         os.remove(db_path)
 
@@ -81,5 +84,528 @@ def test_metric_engine_calculation():
     assert len(margin) == 1
     assert margin.iloc[0] == (100 - 60) / 100
     
+    cache.close()
     if os.path.exists(db_path):
         os.remove(db_path)
+
+
+def test_company_get_raw_fact_from_normalized_cache(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "normalized.db"), normalized=True)
+    cik = "CIK0000320193"
+    cache.store(cik, {
+        "facts": {
+            "us-gaap": {
+                "Revenues": {
+                    "units": {
+                        "USD": [
+                            {"val": 100, "end": "2023-01-01", "form": "10-K", "accn": "1", "filed": "2023-02-01"},
+                            {"val": 110, "end": "2023-01-01", "form": "10-K", "accn": "2", "filed": "2024-02-01"},
+                            {"val": 200, "end": "2024-01-01", "form": "10-K", "accn": "2", "filed": "2024-02-01"}
+                        ]
+                    }
+                }
+            }
+        }
+    })
+
+    company = Company(cik=cik, name="Apple", cache=cache)
+    rev_series = company.get_raw_fact("Revenues", filings_type="10-K")
+
+    assert list(rev_series) == [110, 200]
+    assert rev_series.index[0] == pd.to_datetime("2023-01-01")
+    # The indexed query answered the request without deserializing the document
+    assert company._filing_data is None
+
+
+def test_raw_fact_dtypes_match_across_storage_paths(tmp_path):
+    document = {"facts": {
+        "dei": {"EntityCommonStockSharesOutstanding": {"units": {"shares": [
+            {"val": 15_000_000_000, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+            {"val": 15_500_000_000, "end": "2024-01-01", "form": "10-K", "filed": "2024-02-01"},
+        ]}}},
+        "us-gaap": {"EarningsPerShareBasic": {"units": {"USD/shares": [
+            {"val": 5.5, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+        ]}}},
+    }}
+    in_memory = Company(cik=1, name="Co")
+    in_memory.filing_data = document
+    cache = SECCache(db_path=str(tmp_path / "dtypes.db"), normalized=True)
+    cache.store("CIK0000000001", document)
+    normalized = Company(cik=1, name="Co", cache=cache)
+
+    for tag, dtype in (("EntityCommonStockSharesOutstanding", "int64"), ("EarningsPerShareBasic", "float64")):
+        from_frame = in_memory.get_raw_fact(tag)
+        from_cache = normalized.get_raw_fact(tag)
+        assert from_frame.dtype == from_cache.dtype == dtype
+        assert list(from_frame) == list(from_cache)
+    cache.close()
+
+
+def test_company_tag_index_is_built_once(tmp_path):
+    from unittest.mock import patch
+
+    cache = SECCache(db_path=str(tmp_path / "index.db"))
+    cik = "CIK0000320193"
+    cache.store(cik, {
+        "facts": {
+            "us-gaap": {"Revenues": {"units": {"USD": [
+                {"val": 100, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"}]}}},
+            "ifrs-full": {"Revenues": {"units": {"EUR": [
+                {"val": 90, "end": "2022-01-01", "form": "10-K", "filed": "2022-02-01"}]}}},
+        }
+    })
+
+    company = Company(cik=cik, name="Apple", cache=cache)
+    with patch.object(Company, "_build_tag_index", wraps=Company._build_tag_index) as build:
+        assert list(company.get_raw_fact("Revenues")) == [90, 100]
+        assert company.get_raw_fact("Missing").empty
+        assert company.get_raw_fact("Revenues", filings_type="10-Q").empty
+    build.assert_called_once()
+    assert [(taxonomy, unit) for taxonomy, unit, _ in company.tag_index["Revenues"]] == [
+        ("us-gaap", "USD"), ("ifrs-full", "EUR")
+    ]
+    cache.close()
+
+
+def test_company_memoizes_raw_facts_with_lru_bound(tmp_path):
+    from unittest.mock import patch
+
+    cache = SECCache(db_path=str(tmp_path / "memo.db"))
+    cik = "CIK0000320193"
+    entry = {"val": 1, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"}
+    cache.store(cik, {"facts": {"us-gaap": {tag: {"units": {"USD": [entry]}} for tag in ("A", "B", "C")}}})
+
+    company = Company(cik=cik, name="Apple", cache=cache, fact_cache_size=2)
+    with patch.object(Company, "_load_raw_fact", autospec=True, side_effect=Company._load_raw_fact) as build:
+        first = company.get_raw_fact("A")
+        first.iloc[0] = 999  # callers get copies, the memoized series stays intact
+        assert company.get_raw_fact("A").iloc[0] == 1
+        assert build.call_count == 1
+
+        company.get_raw_fact("B")
+        company.get_raw_fact("C")  # evicts "A", the least recently used entry
+        assert list(company._fact_cache) == [("B", "10-K"), ("C", "10-K")]
+
+        company.refresh()
+        assert not company._fact_cache
+        company.get_raw_fact("B")
+        assert build.call_count == 4
+    cache.close()
+
+
+def test_company_facts_frame_flattens_all_facts():
+    company = Company(cik="320193", name="Apple")
+    company.filing_data = {
+        "facts": {
+            "us-gaap": {
+                "Revenues": {"units": {"USD": [
+                    {"val": 100, "start": "2022-01-01", "end": "2022-12-31", "fy": 2022, "fp": "FY",
+                     "form": "10-K", "filed": "2023-02-01"},
+                    {"val": 105, "start": "2022-01-01", "end": "2022-12-31", "fy": 2023, "fp": "FY",
+                     "form": "10-K", "filed": "2024-02-01"},
+                ]}},
+                "Assets": {"units": {"USD": [
+                    {"val": 500, "end": "2022-12-31", "fy": 2022, "fp": "FY", "form": "10-K", "filed": "2023-02-01"},
+                ]}},
+            },
+            "dei": {"EntityPublicFloat": {"units": {"USD": [
+                {"val": 7, "end": "2022-06-30", "fy": 2022, "fp": "FY", "form": "10-K", "filed": "2023-02-01"},
+            ]}}},
+        }
+    }
+
+    frame = company.facts_frame()
+
+    assert len(frame) == 4
+    assert {"taxonomy", "tag", "unit", "form", "fy", "fp", "start", "end", "filed", "val"} <= set(frame.columns)
+    assert frame["tag"].dtype == "category"
+    assert pd.api.types.is_datetime64_any_dtype(frame["end"])
+    assert frame["latest"].sum() == 3
+    assert company.facts_frame() is frame
+
+    revenues = company.get_raw_fact("Revenues")
+    assert list(revenues) == [105]
+    assert revenues.index[0] == pd.Timestamp("2022-12-31")
+    assert list(company.get_raw_fact("EntityPublicFloat")) == [7]
+
+
+def _store_gross_margin_universe(cache, ciks):
+    for i, cik in enumerate(ciks, start=1):
+        cache.store(cik, {"facts": {"us-gaap": {
+            "Revenues": {"units": {"USD": [
+                {"val": 100 * i, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+                {"val": 200 * i, "end": "2024-01-01", "form": "10-K", "filed": "2024-02-01"},
+            ]}},
+            "CostOfGoodsSold": {"units": {"USD": [
+                {"val": 50 * i, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+                {"val": 50 * i, "end": "2024-01-01", "form": "10-K", "filed": "2024-02-01"},
+            ]}},
+        }}})
+
+
+def _gross_margin_engine():
+    registry = MetricRegistry()
+    registry.register("GrossMargin",
+                      components={"rev": ["Revenues"], "cogs": ["CostOfGoodsSold"]},
+                      formula=lambda rev, cogs: (rev - cogs) / rev)
+    registry.register("Revenue", components={"rev": ["Revenues"]}, formula=lambda rev: rev)
+    return MetricEngine(registry=registry)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_metric_engine_calculate_many(tmp_path, workers):
+    cache = SECCache(db_path=str(tmp_path / "universe.db"))
+    ciks = ["CIK0000000001", "CIK0000000002", "CIK0000000003"]
+    _store_gross_margin_universe(cache, ciks)
+    companies = [Company(cik=cik, name=cik, cache=cache) for cik in ciks[:2]] + [3]
+
+    result = _gross_margin_engine().calculate_many(companies, ["GrossMargin", "Revenue"], workers=workers)
+
+    assert list(result.columns) == ["cik", "metric", "date", "value"]
+    assert len(result) == 12
+    margins = result[(result["metric"] == "GrossMargin") & (result["cik"] == "CIK0000000003")]
+    assert list(margins["value"]) == [0.5, 0.75]
+    assert list(margins["date"]) == [pd.Timestamp("2023-01-01"), pd.Timestamp("2024-01-01")]
+    cache.close()
+
+
+def test_calculate_many_prefetches_filings_before_forking(tmp_path):
+    from unittest.mock import Mock, patch
+
+    cache = SECCache(db_path=str(tmp_path / "cold.db"))
+    ciks = ["CIK0000000001", "CIK0000000002", "CIK0000000003"]
+    requested = []
+
+    async def fake_fetch(fetch_ciks, cache=None, collect=True, **kwargs):
+        requested.extend(fetch_ciks)
+        # The third download fails
+        _store_gross_margin_universe(cache, fetch_ciks[:2])
+        return {cik: cik != ciks[2] for cik in fetch_ciks}
+
+    # A blocking request from a worker would succeed and add the third company to the result
+    response = Mock(status_code=200, headers={})
+    response.json.return_value = {"facts": {"us-gaap": {"Revenues": {"units": {"USD": [
+        {"val": 1, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+    ]}}}}}
+    with patch("FortyFour.Finance.fetcher.fetch_company_filings", fake_fetch), \
+            patch("FortyFour.Finance.utils._timed_get", return_value=response):
+        result = _gross_margin_engine().calculate_many(ciks, ["Revenue"], workers=2, cache=cache)
+
+    assert requested == ciks
+    assert sorted(result["cik"].unique()) == ciks[:2]
+    cache.close()
+
+
+def test_calculate_many_runs_in_process_without_fork(tmp_path, monkeypatch):
+    from FortyFour.Finance import engine
+
+    cache = SECCache(db_path=str(tmp_path / "spawn.db"))
+    ciks = ["CIK0000000001", "CIK0000000002"]
+    _store_gross_margin_universe(cache, ciks)
+    monkeypatch.setattr(engine.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    monkeypatch.setattr(engine, "ProcessPoolExecutor", None)
+
+    companies = [Company(cik=cik, name=cik, cache=cache) for cik in ciks]
+    result = _gross_margin_engine().calculate_many(companies, ["GrossMargin"], workers=4)
+
+    assert len(result) == 4
+    cache.close()
+
+
+def test_metric_engine_calculate_many_rejects_unknown_metrics():
+    with pytest.raises(ValueError):
+        _gross_margin_engine().calculate_many(["1"], ["Unknown"])
+
+
+def test_metric_engine_resolves_metric_dependencies_once(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "dag.db"))
+    _store_gross_margin_universe(cache, ["CIK0000000001"])
+    company = Company(cik="CIK0000000001", name="Co", cache=cache)
+
+    calls = []
+
+    def gross_profit(rev, cogs):
+        calls.append("GrossProfit")
+        return rev - cogs
+
+    registry = MetricRegistry()
+    registry.register("Margin", components={"gp": "GrossProfit", "rev": ["Revenues"]},
+                      formula=lambda gp, rev: gp / rev)
+    registry.register("GrossProfit", components={"rev": ["Revenues"], "cogs": ["CostOfGoodsSold"]},
+                      formula=gross_profit)
+    registry.register("DoubleGrossProfit", components={"gp": "GrossProfit"}, formula=lambda gp: gp * 2)
+    engine = MetricEngine(registry=registry)
+
+    assert registry.evaluation_order(["Margin"])[-1] == "Margin"
+    result = engine.calculate_many([company], ["Margin", "DoubleGrossProfit", "GrossProfit"])
+
+    assert calls == ["GrossProfit"]
+    margin = result[result["metric"] == "Margin"]["value"]
+    assert list(margin) == [0.5, 0.75]
+    assert list(result[result["metric"] == "DoubleGrossProfit"]["value"]) == [100, 300]
+    cache.close()
+
+
+def test_metric_registry_rejects_cycles_and_unknown_references():
+    registry = MetricRegistry()
+    registry.register("A", components={"b": "B"}, formula=lambda b: b)
+    registry.register("B", components={"a": "A"}, formula=lambda a: a)
+    registry.register("C", components={"x": "Missing"}, formula=lambda x: x)
+
+    with pytest.raises(ValueError, match="Circular"):
+        registry.evaluation_order(["A"])
+    with pytest.raises(ValueError, match="Missing"):
+        MetricEngine(registry=registry).calculate(Company(cik="1", name="Co"), "C")
+
+
+def test_metric_engine_calculate_panel_matches_per_company(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "panel.db"))
+    ciks = ["CIK0000000001", "CIK0000000002"]
+    _store_gross_margin_universe(cache, ciks)
+    # A third company reporting on other dates, and a fourth missing COGS entirely
+    cache.store("CIK0000000003", {"facts": {"us-gaap": {
+        "Revenues": {"units": {"USD": [{"val": 10, "end": "2023-06-30", "form": "10-K", "filed": "2023-08-01"}]}},
+        "CostOfGoodsSold": {"units": {"USD": [{"val": 4, "end": "2023-06-30", "form": "10-K", "filed": "2023-08-01"}]}},
+    }}})
+    cache.store("CIK0000000004", {"facts": {"us-gaap": {
+        "Revenues": {"units": {"USD": [{"val": 10, "end": "2023-06-30", "form": "10-K", "filed": "2023-08-01"}]}},
+    }}})
+    companies = [Company(cik=i, name=str(i), cache=cache) for i in range(1, 5)]
+    engine = _gross_margin_engine()
+
+    panel = engine.calculate_panel(companies, "GrossMargin")
+
+    assert list(panel.columns) == ["CIK0000000001", "CIK0000000002", "CIK0000000003", "CIK0000000004"]
+    assert panel["CIK0000000004"].isna().all()
+    for company in companies[:3]:
+        expected = engine.calculate(company, "GrossMargin")
+        pd.testing.assert_series_equal(panel[company.cik].dropna(), expected, check_names=False, check_freq=False)
+    cache.close()
+
+
+def test_metric_engine_calculate_panel_falls_back_for_series_only_formulas(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "panel.db"))
+    _store_gross_margin_universe(cache, ["CIK0000000001", "CIK0000000002"])
+    registry = MetricRegistry()
+    registry.register("Latest", components={"rev": ["Revenues"]},
+                      formula=lambda rev: rev.tail(1) if isinstance(rev, pd.Series) else None)
+    engine = MetricEngine(registry=registry)
+
+    panel = engine.calculate_panel([Company(cik=i, name=str(i), cache=cache) for i in (1, 2)], "Latest")
+
+    assert panel.loc[pd.Timestamp("2024-01-01")].tolist() == [200, 400]
+    cache.close()
+
+
+def test_metric_engine_persists_results_until_source_or_formula_changes(tmp_path):
+    from unittest.mock import patch
+
+    cache = SECCache(db_path=str(tmp_path / "results.db"))
+    _store_gross_margin_universe(cache, ["CIK0000000001"])
+    engine = _gross_margin_engine()
+    engine.cache_results = True
+
+    first = engine.calculate(Company(cik=1, name="Co", cache=cache), "GrossMargin")
+    with patch.object(Company, "get_raw_fact") as get_raw_fact:
+        # A fresh Company is served from the results store without touching its facts
+        served = engine.calculate(Company(cik=1, name="Co", cache=cache), "GrossMargin")
+        get_raw_fact.assert_not_called()
+    pd.testing.assert_series_equal(served, first, check_freq=False)
+
+    # New filing data for the company invalidates the stored result
+    time.sleep(0.01)
+    cache.store("CIK0000000001", {"facts": {"us-gaap": {
+        "Revenues": {"units": {"USD": [{"val": 100, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"}]}},
+        "CostOfGoodsSold": {"units": {"USD": [{"val": 90, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"}]}},
+    }}})
+    refreshed = engine.calculate(Company(cik=1, name="Co", cache=cache), "GrossMargin")
+    assert list(refreshed) == [0.1]
+
+    # So does a change of formula
+    engine.registry.register("GrossMargin", components={"rev": ["Revenues"], "cogs": ["CostOfGoodsSold"]},
+                             formula=lambda rev, cogs: rev / cogs)
+    assert list(engine.calculate(Company(cik=1, name="Co", cache=cache), "GrossMargin")) == [100 / 90]
+    cache.close()
+
+
+def test_metric_registry_fingerprint_tracks_dependencies():
+    registry = MetricRegistry()
+    registry.register("Base", components={"rev": ["Revenues"]}, formula=lambda rev: rev)
+    registry.register("Derived", components={"base": "Base"}, formula=lambda base: base * 2)
+    before = registry.fingerprint("Derived")
+    assert registry.fingerprint("Derived") == before
+
+    registry.register("Base", components={"rev": ["Revenues"]}, formula=lambda rev: rev + 1)
+    assert registry.fingerprint("Derived") != before
+
+
+def test_company_from_ticker(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "tickers.db"))
+    cache.store_tickers([{"ticker": "AAPL", "cik": 320193, "name": "Apple Inc.", "exchange": "Nasdaq"}])
+
+    apple = Company.from_ticker("aapl", cache=cache, fact_cache_size=4)
+    assert (apple.cik, apple.name, apple.cache, apple.fact_cache_size) == ("CIK0000320193", "Apple Inc.", cache, 4)
+    with pytest.raises(ValueError):
+        Company.from_ticker("NOPE", cache=cache)
+    cache.close()
+
+
+def test_rolling_cagr_counts_periods_by_date():
+    from FortyFour.Finance import rolling_cagr
+
+    dates = pd.to_datetime(["2019-12-31", "2020-12-31", "2021-06-30", "2021-12-31", "2022-12-31"])
+    revenue = pd.Series([100.0, 110.0, 999.0, 121.0, 0.0], index=dates, name="rev")
+
+    result = rolling_cagr(revenue, years=2)
+
+    assert result.name == "rev"
+    assert list(result.index) == list(dates)
+    assert result.iloc[:3].isna().all()
+    # The mid-year row is skipped: periods come from the dates, not the row count
+    assert result.iloc[3] == pytest.approx(10.0)
+    # Non-positive endpoint
+    assert pd.isna(result.iloc[4])
+
+
+def test_rolling_and_cross_sectional_cagr_over_a_panel():
+    from FortyFour.Finance import cross_sectional_cagr, rolling_cagr
+
+    dates = pd.to_datetime(["2020-12-31", "2021-12-31", "2022-12-31"])
+    panel = pd.DataFrame(
+        {"CIK1": [100.0, 110.0, 121.0], "CIK2": [-5.0, 10.0, 40.0], "CIK3": [None, 50.0, 75.0]},
+        index=pd.Index(dates, name="Date"),
+    )
+
+    rolling = rolling_cagr(panel, years=1)
+    assert list(rolling.columns) == ["CIK1", "CIK2", "CIK3"]
+    assert rolling.index.name == "Date"
+    assert rolling["CIK1"].tolist()[1:] == pytest.approx([10.0, 10.0])
+    assert pd.isna(rolling.loc["2021-12-31", "CIK2"])
+    assert rolling.loc["2022-12-31", "CIK2"] == pytest.approx(300.0)
+
+    five_year = cross_sectional_cagr(panel, years=2)
+    assert five_year.name == "cagr"
+    assert five_year["CIK1"] == pytest.approx(10.0)
+    assert five_year[["CIK2", "CIK3"]].isna().all()
+    as_of = cross_sectional_cagr(panel, years=1, as_of="2021-12-31")
+    assert as_of["CIK1"] == pytest.approx(10.0)
+    assert as_of[["CIK2", "CIK3"]].isna().all()
+
+
+def _scaled_revenue_registry(formula):
+    registry = MetricRegistry()
+    registry.register("Scaled", components={"rev": ["Revenues"]}, formula=formula)
+    return registry
+
+
+def _scale_helper(rev):
+    return rev * 2
+
+
+def test_metric_fingerprint_covers_closures_defaults_and_helpers():
+    def make(k):
+        return lambda rev: rev * k
+
+    def with_default(scale):
+        def formula(rev, scale=scale):
+            return rev * scale
+        return formula
+
+    def fingerprint(formula):
+        return _scaled_revenue_registry(formula).fingerprint("Scaled")
+
+    assert fingerprint(make(1)) == fingerprint(make(1))
+    assert fingerprint(make(1)) != fingerprint(make(1000))
+    assert fingerprint(with_default(1)) != fingerprint(with_default(2))
+
+    global _scale_helper
+    original = _scale_helper
+    uses_helper = lambda rev: _scale_helper(rev)
+    before = fingerprint(uses_helper)
+    try:
+        _scale_helper = lambda rev: rev * 3
+        assert fingerprint(uses_helper) != before
+    finally:
+        _scale_helper = original
+
+    # Captured values without a stable representation disable the persisted results
+    table = pd.DataFrame({"scale": [2]})
+    registry = _scaled_revenue_registry(lambda rev: rev * table["scale"].iloc[0])
+    registry.register("Derived", components={"scaled": "Scaled"}, formula=lambda scaled: scaled)
+    assert registry.fingerprint("Scaled") is None
+    assert registry.fingerprint("Derived") is None
+
+
+def test_persisted_results_recompute_when_a_closure_constant_changes(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "closure.db"))
+    _store_gross_margin_universe(cache, ["CIK0000000001"])
+
+    def make(k):
+        return lambda rev: rev * k
+
+    small = MetricEngine(_scaled_revenue_registry(make(1)), cache_results=True)
+    assert list(small.calculate(Company(cik=1, name="Co", cache=cache), "Scaled")) == [100, 200]
+    large = MetricEngine(_scaled_revenue_registry(make(1000)), cache_results=True)
+    assert list(large.calculate(Company(cik=1, name="Co", cache=cache), "Scaled")) == [100_000, 200_000]
+
+    table = pd.DataFrame({"scale": [3]})
+    unstable = MetricEngine(_scaled_revenue_registry(lambda rev: rev * table["scale"].iloc[0]), cache_results=True)
+    assert list(unstable.calculate(Company(cik=1, name="Co", cache=cache), "Scaled")) == [300, 600]
+    table["scale"] = 4
+    assert list(unstable.calculate(Company(cik=1, name="Co", cache=cache), "Scaled")) == [400, 800]
+    cache.close()
+
+
+def test_formulas_using_library_functions_are_persisted(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "library.db"))
+    _store_gross_margin_universe(cache, ["CIK0000000001"])
+    registry = _scaled_revenue_registry(lambda rev: to_numeric(concat([rev])) * 2)
+
+    assert registry.fingerprint("Scaled") is not None
+    engine = MetricEngine(registry, cache_results=True)
+    assert list(engine.calculate(Company(cik=1, name="Co", cache=cache), "Scaled")) == [200, 400]
+    stored = cache._connection().execute("SELECT COUNT(*) FROM metric_cache WHERE metric = 'Scaled'").fetchone()
+    assert stored == (1,)
+    cache.close()
+
+
+def test_unstable_fingerprints_are_reported_once(caplog):
+    table = pd.DataFrame({"scale": [2]})
+    registry = _scaled_revenue_registry(lambda rev: rev * table["scale"].iloc[0])
+
+    with caplog.at_level("WARNING"):
+        registry.fingerprint("Scaled")
+        registry.fingerprint("Scaled")
+    assert len([record for record in caplog.records if "Scaled" in record.getMessage()]) == 1
+
+
+def test_cagr_handles_empty_inputs():
+    from FortyFour.Finance import cross_sectional_cagr, rolling_cagr
+
+    assert rolling_cagr(pd.Series(dtype=float)).empty
+    gaps = pd.Series([None, None], index=pd.to_datetime(["2020-12-31", "2021-12-31"]), dtype=float)
+    assert rolling_cagr(gaps, years=1).isna().all()
+    empty_panel = cross_sectional_cagr(pd.DataFrame(columns=["CIK1", "CIK2"], dtype=float))
+    assert list(empty_panel.index) == ["CIK1", "CIK2"]
+    assert empty_panel.isna().all()
+
+
+@pytest.mark.parametrize("unit", ["s", "ms", "us", "ns"])
+def test_cagr_accepts_any_datetime_resolution(unit):
+    import datetime
+
+    from FortyFour.Finance import cross_sectional_cagr, rolling_cagr
+
+    dates = pd.DatetimeIndex([datetime.date(2020, 12, 31), datetime.date(2021, 12, 31)]).as_unit(unit)
+    revenue = pd.Series([100.0, 110.0], index=dates)
+
+    assert rolling_cagr(revenue, years=1).iloc[-1] == pytest.approx(10.0)
+    assert cross_sectional_cagr(revenue.to_frame("CIK1"), years=1)["CIK1"] == pytest.approx(10.0)
+
+
+def test_cagr_rejects_duplicate_dates():
+    from FortyFour.Finance import rolling_cagr
+
+    dates = pd.to_datetime(["2020-12-31", "2020-12-31", "2021-12-31"])
+    with pytest.raises(ValueError, match="duplicates"):
+        rolling_cagr(pd.Series([1.0, 2.0, 3.0], index=dates), years=1)
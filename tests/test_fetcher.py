@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import httpx
+
+from FortyFour.Finance.fetcher import TokenBucket, fetch_company_filings
+from FortyFour.Finance.utils import SECCache
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_fetch_company_filings_stores_results(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "fetch.db"))
+    cache.store("CIK0000000003", {"cached": True})
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        assert "FortyFour" in request.headers["User-Agent"]
+        if request.url.path.endswith("CIK0000000002.json"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"cik": 1})
+
+    async def run():
+        async with _client(handler) as client:
+            return await fetch_company_filings([1, "2", "CIK0000000003"], cache=cache, client=client)
+
+    results = asyncio.run(run())
+
+    assert results == {"CIK0000000001": {"cik": 1}, "CIK0000000002": {}, "CIK0000000003": {"cached": True}}
+    assert sorted(requested) == [
+        "/api/xbrl/companyfacts/CIK0000000001.json",
+        "/api/xbrl/companyfacts/CIK0000000002.json",
+    ]
+    assert cache.get("CIK0000000001") == {"cik": 1}
+    cache.close()
+
+
+def test_fetch_company_filings_retries_throttled_requests():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.url.path)
+        if len(attempts) < 3:
+            return httpx.Response(429 if len(attempts) == 1 else 503)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        async with _client(handler) as client:
+            return await fetch_company_filings(["1"], client=client, backoff=0, collect=False)
+
+    assert asyncio.run(run()) == {"CIK0000000001": True}
+    assert len(attempts) == 3
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # One token is available immediately, the four others are released at 20/s
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_fetch_company_filings_revalidates_expired_entries(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "fetch.db"))
+    cache.store("CIK0000000001", {"stale": True}, etag='"abc"')
+    with cache._connection() as conn:
+        conn.execute("UPDATE sec_cache SET last_updated = 0")
+
+    def handler(request):
+        assert request.headers["If-None-Match"] == '"abc"'
+        return httpx.Response(304)
+
+    async def run():
+        async with _client(handler) as client:
+            return await fetch_company_filings(["1"], cache=cache, client=client)
+
+    assert asyncio.run(run()) == {"CIK0000000001": {"stale": True}}
+    assert cache.get("CIK0000000001") == {"stale": True}
+    cache.close()
+
+
+def test_fetch_logo_urls_caches_positive_and_negative_results(tmp_path):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from unittest.mock import patch
+
+    from FortyFour.Finance import utils
+    from FortyFour.Finance.fetcher import fetch_logo_urls
+
+    requested = []
+    in_flight = [0, 0]  # current, peak
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_HEAD(self):
+            with lock:
+                requested.append(self.path)
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            status = {"/apple--big.svg": 200, "/microsoft--big.svg": 200, "/flaky--big.svg": 503}
+            self.send_response(status.get(self.path, 404))
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+    cache = SECCache(db_path=str(tmp_path / "logos.db"))
+    names = ["Apple Inc.", "APPLE INC", "Microsoft Corp", "Unknown Co", "Missing Ltd", "Flaky plc", "The Inc."]
+    try:
+        with patch.object(utils, "LOGO_BASE_URL", base_url):
+            urls = asyncio.run(fetch_logo_urls(names, cache=cache, concurrency=2))
+            assert sorted(requested) == sorted(
+                ["/apple--big.svg", "/microsoft--big.svg", "/unknown-co--big.svg", "/missing--big.svg", "/flaky--big.svg"]
+            )
+            assert in_flight[1] <= 2
+
+            # Everything but the transient 5xx is answered from the persistent cache
+            requested.clear()
+            assert asyncio.run(fetch_logo_urls(names, cache=cache)) == urls
+            assert requested == ["/flaky--big.svg"]
+
+            # Negative results expire sooner than positive ones
+            requested.clear()
+            cache._connection().execute("UPDATE logo_cache SET checked_at = checked_at - 2 * 86400")
+            cache._connection().commit()
+            asyncio.run(fetch_logo_urls(names, cache=cache))
+            assert sorted(requested) == ["/flaky--big.svg", "/missing--big.svg", "/unknown-co--big.svg"]
+            assert utils.get_company_logo_url("Apple Inc.", cache=cache) == f"{base_url}apple--big.svg"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert urls == {
+        "Apple Inc.": f"{base_url}apple--big.svg",
+        "APPLE INC": f"{base_url}apple--big.svg",
+        "Microsoft Corp": f"{base_url}microsoft--big.svg",
+        "Unknown Co": utils.LOGO_PLACEHOLDER_URL,
+        "Missing Ltd": utils.LOGO_PLACEHOLDER_URL,
+        "Flaky plc": utils.LOGO_PLACEHOLDER_URL,
+        "The Inc.": utils.LOGO_PLACEHOLDER_URL,
+    }
+    cache.close()
+
+
+def test_token_bucket_default_never_exceeds_rate():
+    async def run():
+        bucket = TokenBucket(rate=10)
+        start = time.monotonic()
+        stamps = []
+        for _ in range(12):
+            await bucket.acquire()
+            stamps.append(time.monotonic() - start)
+        return stamps
+
+    stamps = asyncio.run(run())
+    # The default bucket holds a single token: no burst on top of the refill
+    assert sum(stamp < 1 for stamp in stamps) <= 10
+    assert stamps[-1] >= 1.05
+
+
+def test_fetch_company_filings_skips_fresh_entries_without_decoding(tmp_path):
+    from unittest.mock import patch
+
+    cache = SECCache(db_path=str(tmp_path / "fresh.db"))
+    cache.store("CIK0000000001", {"cached": True})
+
+    def handler(request):
+        raise AssertionError("fresh entries must not be requested")
+
+    async def run():
+        async with _client(handler) as client:
+            return await fetch_company_filings([1], cache=cache, client=client, collect=False)
+
+    with patch.object(SECCache, "get", side_effect=AssertionError("payload decoded")):
+        assert asyncio.run(run()) == {"CIK0000000001": True}
+    cache.close()
@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
+
+# Dependencies that must only be imported by the code paths that use them
+HEAVY_MODULES = ("boto3", "httpx", "numpy", "pandas", "plotly", "requests", "sqlalchemy")
+
+_BENCHMARK = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = sorted(name for name in {heavy!r} if name in sys.modules)
+start = time.perf_counter()
+import pandas
+print(json.dumps({{"elapsed": elapsed, "pandas": time.perf_counter() - start, "loaded": loaded}}))
+"""
+
+
+def _benchmark_import(statement):
+    code = _BENCHMARK.format(statement=statement, heavy=HEAVY_MODULES)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(completed.stdout)
+
+
+@pytest.mark.parametrize("statement", [
+    "import FortyFour",
+    "import FortyFour.Utils",
+    "import FortyFour.Finance",
+    "import FortyFour; FortyFour.Utils; FortyFour.Finance",
+    "from FortyFour.Finance import SECCache, normalize_cik",
+])
+def test_import_does_not_load_heavy_dependencies(statement):
+    result = _benchmark_import(statement)
+
+    assert result["loaded"] == []
+    # Importing the package must stay well below the cost of a single heavy dependency
+    assert result["elapsed"] < result["pandas"], result
+
+
+def test_heavy_dependencies_load_on_first_use():
+    result = _benchmark_import("from FortyFour.Finance import Company")
+
+    assert "pandas" in result["loaded"]
+    assert "plotly" not in result["loaded"]
+
+
+def test_subpackages_are_attributes_of_the_package():
+    code = "import FortyFour; print(FortyFour.Utils.__name__, FortyFour.Finance.__name__)"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+    assert completed.stdout.split() == ["FortyFour.Utils", "FortyFour.Finance"]
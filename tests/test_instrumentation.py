@@ -0,0 +1,127 @@
+import os
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, os.path.abspath("src"))
+
+from FortyFour.Finance import Company, MetricEngine, MetricRegistry, SECCache
+from FortyFour.Finance.instrumentation import Instrumentation, OpenTelemetryListener, telemetry
+
+
+@pytest.fixture
+def events():
+    recorded = []
+    listener = telemetry.add_listener(lambda kind, name, value, attributes: recorded.append((kind, name, attributes)))
+    telemetry.reset()
+    yield recorded
+    telemetry.remove_listener(listener)
+    telemetry.reset()
+
+
+def test_instrumentation_aggregates_counters_and_timers():
+    instrumentation = Instrumentation()
+    instrumentation.increment("hits")
+    instrumentation.increment("hits", 2)
+    instrumentation.observe("parse", 0.5)
+    with instrumentation.timer("parse") as attributes:
+        attributes["status"] = 200
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["counters"] == {"hits": 3}
+    assert snapshot["timers"]["parse"]["count"] == 2
+    assert snapshot["timers"]["parse"]["max"] == 0.5
+    instrumentation.reset()
+    assert instrumentation.snapshot() == {"counters": {}, "timers": {}}
+
+    instrumentation.enabled = False
+    instrumentation.increment("hits")
+    assert instrumentation.snapshot()["counters"] == {}
+
+
+def test_failing_listeners_do_not_break_the_hot_path():
+    instrumentation = Instrumentation()
+    instrumentation.add_listener(lambda *event: 1 / 0)
+    instrumentation.increment("hits")
+    assert instrumentation.snapshot()["counters"] == {"hits": 1}
+
+
+def test_open_telemetry_listener_creates_instruments_once():
+    class Instrument:
+        def __init__(self):
+            self.calls = []
+
+        def add(self, value, attributes=None):
+            self.calls.append((value, attributes))
+
+        record = add
+
+    class Meter:
+        def __init__(self):
+            self.created = {}
+
+        def create_counter(self, name, **kwargs):
+            return self.created.setdefault(name, Instrument())
+
+        def create_histogram(self, name, unit=None, **kwargs):
+            return self.created.setdefault(name, Instrument())
+
+    meter = Meter()
+    instrumentation = Instrumentation()
+    instrumentation.add_listener(OpenTelemetryListener(meter))
+    instrumentation.increment("sec_cache.hit", tier="sqlite")
+    instrumentation.increment("sec_cache.hit", tier="memory")
+    instrumentation.observe("http.request", 0.25, status=200)
+
+    assert set(meter.created) == {"fortyfour.sec_cache.hit", "fortyfour.http.request"}
+    assert meter.created["fortyfour.sec_cache.hit"].calls == [(1, {"tier": "sqlite"}), (1, {"tier": "memory"})]
+    assert meter.created["fortyfour.http.request"].calls == [(0.25, {"status": 200})]
+
+
+def test_cache_and_engine_report_events(tmp_path, events):
+    cache = SECCache(db_path=str(tmp_path / "instrumented.db"))
+    cik = "CIK0000320193"
+    assert cache.get(cik) is None
+    cache.store(cik, {"facts": {"us-gaap": {"Revenues": {"units": {"USD": [
+        {"val": 100, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+    ]}}}}})
+    registry = MetricRegistry()
+    registry.register("Revenue", components={"rev": ["Revenues"]}, formula=lambda rev: rev)
+    MetricEngine(registry=registry).calculate(Company(cik=cik, name="Apple", cache=cache), "Revenue")
+    cache.mark_stale([cik])
+    assert cache.get(cik) is None
+
+    assert [(kind, name) for kind, name, _ in events] == [
+        ("counter", "sec_cache.miss"),
+        ("counter", "sec_cache.hit"),
+        ("timer", "sec_cache.decode"),
+        ("timer", "metric.compute"),
+        ("counter", "sec_cache.stale"),
+    ]
+    assert events[3][2] == {"metric": "Revenue"}
+    counters = telemetry.snapshot()["counters"]
+    assert counters == {"sec_cache.miss": 1, "sec_cache.hit": 1, "sec_cache.stale": 1}
+    cache.close()
+
+
+def test_fetcher_reports_http_latency_and_bytes(events):
+    import asyncio
+
+    import httpx
+
+    from FortyFour.Finance.fetcher import fetch_company_filings
+
+    body = b'{"cik": 1}'
+
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await fetch_company_filings(["1"], client=client)
+
+    assert asyncio.run(run()) == {"CIK0000000001": {"cik": 1}}
+    snapshot = telemetry.snapshot()
+    assert snapshot["counters"] == {"http.bytes": len(body)}
+    assert snapshot["timers"]["http.request"]["count"] == 1
+    assert snapshot["timers"]["http.decode"]["count"] == 1
+    assert ("timer", "http.request", {"client": "httpx", "status": 200}) in events
@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from FortyFour.Finance.company import Company
+from FortyFour.Finance.engine import MetricEngine, MetricRegistry
+from FortyFour.Finance.periods import TTM, Quarterly, quarterly_values, trailing_twelve_months
+
+
+def _fact(val, start, end, form, filed):
+    return {"val": val, "start": start, "end": end, "form": form, "filed": filed}
+
+
+REVENUE_FACTS = [
+    # FY2022 reported only as year-to-date values
+    _fact(5, "2022-01-01", "2022-03-31", "10-Q", "2022-04-20"),
+    _fact(15, "2022-01-01", "2022-06-30", "10-Q", "2022-07-20"),
+    _fact(30, "2022-01-01", "2022-09-30", "10-Q", "2022-10-20"),
+    _fact(50, "2022-01-01", "2022-12-31", "10-K", "2023-02-01"),
+    # FY2023 with discrete 3-month values next to the year-to-date ones
+    _fact(10, "2023-01-01", "2023-03-31", "10-Q", "2023-04-20"),
+    _fact(20, "2023-04-01", "2023-06-30", "10-Q", "2023-07-20"),
+    _fact(30, "2023-01-01", "2023-06-30", "10-Q", "2023-07-20"),
+    _fact(30, "2023-07-01", "2023-09-30", "10-Q", "2023-10-20"),
+    _fact(60, "2023-01-01", "2023-09-30", "10-Q", "2023-10-20"),
+    _fact(100, "2023-01-01", "2023-12-31", "10-K", "2024-02-01"),
+    # Comparative value repeated in a later filing
+    _fact(50, "2022-01-01", "2022-12-31", "10-K", "2024-02-01"),
+]
+
+
+def _rows(facts):
+    df = pd.DataFrame(facts)
+    for column in ("start", "end", "filed"):
+        df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def test_quarterly_values_derive_missing_quarters():
+    quarters = quarterly_values(_rows(REVENUE_FACTS))
+
+    assert list(quarters) == [5, 10, 15, 20, 10, 20, 30, 40]
+    assert quarters.index[3] == pd.Timestamp("2022-12-31")
+    assert quarters.index.name == "Date"
+
+
+def test_trailing_twelve_months_requires_contiguous_quarters():
+    ttm = trailing_twelve_months(_rows(REVENUE_FACTS))
+    assert list(ttm) == [50, 55, 65, 80, 100]
+    assert ttm.index[0] == pd.Timestamp("2022-12-31")
+
+    # Without the Q1 2023 values the windows spanning the gap are dropped
+    gapped = [f for f in REVENUE_FACTS if f["end"] != "2023-03-31"]
+    assert list(trailing_twelve_months(_rows(gapped)).index) == [pd.Timestamp("2022-12-31")]
+
+
+def test_instant_facts_are_returned_per_end_date():
+    rows = _rows([
+        {"val": 1, "start": None, "end": "2023-03-31", "form": "10-Q", "filed": "2023-04-20"},
+        {"val": 2, "start": None, "end": "2023-06-30", "form": "10-Q", "filed": "2023-07-20"},
+    ])
+    assert list(trailing_twelve_months(rows)) == [1, 2]
+    assert list(quarterly_values(rows)) == [1, 2]
+
+
+def test_period_components_in_metric_engine():
+    company = Company(cik="1", name="Co")
+    company.filing_data = {"facts": {"us-gaap": {
+        "Revenues": {"units": {"USD": REVENUE_FACTS}},
+        "Assets": {"units": {"USD": [
+            {"val": 400, "end": "2023-12-31", "form": "10-K", "filed": "2024-02-01"},
+        ]}},
+    }}}
+    assert list(company.get_quarterly_fact("Revenues"))[-1] == 40
+    assert list(company.get_ttm_fact("Revenues"))[-1] == 100
+    with pytest.raises(ValueError):
+        company.get_period_fact("Revenues", "weekly")
+
+    registry = MetricRegistry()
+    registry.register("AssetTurnoverTTM", components={"rev": TTM(["Missing", "Revenues"]), "assets": ["Assets"]},
+                      formula=lambda rev, assets: rev / assets)
+    registry.register("QuarterlyRevenue", components={"rev": Quarterly(["Revenues"])}, formula=lambda rev: rev)
+    engine = MetricEngine(registry=registry)
+
+    assert engine.calculate(company, "AssetTurnoverTTM").iloc[-1] == 0.25
+    assert len(engine.calculate(company, "QuarterlyRevenue", filings_type="10-Q")) == 8
+    assert repr(TTM(["Revenues"])) == "TTM(['Revenues'])"
@@ -0,0 +1,67 @@
+import math
+
+from FortyFour.Finance.refresh import RefreshPlanner, parse_form_index
+from FortyFour.Finance.utils import SECCache
+
+FORM_INDEX = """Description:           Daily Index of EDGAR Dissemination Feed by Form Type
+Last Data Received:    January 3, 2024
+Comments:              webmaster@sec.gov
+Anonymous FTP:         ftp://ftp.sec.gov/edgar/
+
+
+
+Form Type   Company Name                                                  CIK         Date Filed  File Name
+---------------------------------------------------------------------------------------------------------------------------------------------
+10-K        APPLE INC                                                     320193      20240103    edgar/data/320193/0000320193-24-000001.txt
+10-Q        MICROSOFT CORP                                                789019      20240103    edgar/data/789019/0000789019-24-000002.txt
+10-Q/A      MICROSOFT CORP                                                789019      20240103    edgar/data/789019/0000789019-24-000003.txt
+8-K         AMAZON COM INC                                                1018724     20240103    edgar/data/1018724/0001018724-24-000004.txt
+SC 13G/A    SOME  HOLDINGS  LP                                            1000001     20240103    edgar/data/1000001/0001000001-24-000005.txt
+10-K        NEW FILER INC                                                 1999999     20240103    edgar/data/1999999/0001999999-24-000006.txt
+"""
+
+
+def _write_index(tmp_path):
+    path = tmp_path / "form.20240103.idx"
+    path.write_text(FORM_INDEX)
+    return path
+
+
+def test_parse_form_index(tmp_path):
+    rows = parse_form_index(_write_index(tmp_path))
+
+    assert len(rows) == 6
+    assert rows[0] == {
+        "form_type": "10-K",
+        "company_name": "APPLE INC",
+        "cik": "320193",
+        "date_filed": "20240103",
+        "file_name": "edgar/data/320193/0000320193-24-000001.txt",
+    }
+    assert rows[4]["form_type"] == "SC 13G/A"
+    assert rows[4]["company_name"] == "SOME  HOLDINGS  LP"
+
+
+def test_refresh_planner_refreshes_only_new_filers(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "planner.db"), max_age_days=math.inf)
+    for cik in ("CIK0000320193", "CIK0000789019", "CIK0001018724"):
+        cache.store(cik, {"old": True})
+    planner = RefreshPlanner(cache)
+    index_path = _write_index(tmp_path)
+
+    assert planner.plan(index_path) == ["CIK0000320193", "CIK0000789019"]
+    assert planner.plan(index_path, only_cached=False) == ["CIK0000320193", "CIK0000789019", "CIK0001999999"]
+
+    fetched = []
+
+    def fetch(cik, cache):
+        assert cache.get(cik) is None  # stale entries are no longer served
+        fetched.append(cik)
+        cache.store(cik, {"new": True})
+        return {"new": True}
+
+    assert planner.refresh(index_path, fetch=fetch) == {"CIK0000320193": True, "CIK0000789019": True}
+    assert fetched == ["CIK0000320193", "CIK0000789019"]
+    assert cache.get("CIK0000320193") == {"new": True}
+    assert cache.get("CIK0001018724") == {"old": True}
+    cache.close()
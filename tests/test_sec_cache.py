@@ -22,6 +22,7 @@ def test_sec_cache_store_and_retrieve():
     
     assert retrieved == test_data
     assert cache.get("non_existent") is None
+    cache.close()
     if os.path.exists(db_path):
         os.remove(db_path)
 
@@ -44,5 +45,512 @@ def test_request_company_filing_uses_cache():
         assert res == test_data
         mock_get.assert_not_called()
     
+    cache.close()
     if os.path.exists(db_path):
         os.remove(db_path)
+
+
+def test_normalized_cache_indexes_facts(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "normalized.db"), normalized=True)
+    cik = "CIK0000000001"
+    test_data = {"facts": {"us-gaap": {"Assets": {"units": {"USD": [
+        {"val": 100, "end": "2023-01-01", "form": "10-K", "filed": "2023-02-01"},
+        {"val": 50, "end": "2023-03-31", "form": "10-Q", "filed": "2023-04-20"},
+    ]}}}}}
+    cache.store(cik, test_data)
+
+    entries = cache.get_fact_entries(cik, "Assets", "10-K")
+    assert entries == [{"val": 100, "start": None, "end": "2023-01-01", "filed": "2023-02-01",
+                        "form": "10-K", "fy": None, "fp": None, "accn": None, "frame": None}]
+    assert cache.get_fact_entries(cik, "Liabilities", "10-K") == []
+    assert cache.get_fact_entries("CIK0000000002", "Assets", "10-K") is None
+    # The full document stays available for callers that need it
+    assert cache.get(cik) == test_data
+
+
+def test_non_normalized_store_invalidates_indexed_facts(tmp_path):
+    db_path = str(tmp_path / "mixed.db")
+    cik = "CIK0000000001"
+    SECCache(db_path=db_path, normalized=True).store(cik, {"facts": {}})
+
+    cache = SECCache(db_path=db_path)
+    cache.store(cik, {"facts": {}})
+    assert cache.get_fact_entries(cik, "Assets", "10-K") is None
+
+
+@pytest.mark.parametrize("compression", ["zlib", "zstd"])
+def test_compressed_cache_round_trip(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    db_path = str(tmp_path / f"{compression}.db")
+    cache = SECCache(db_path=db_path, compression=compression)
+    test_data = {"facts": {"us-gaap": {"Assets": {"units": {"USD": [{"val": 100, "end": "2023-01-01"}] * 50}}}}}
+    cache.store("CIK0000000001", test_data)
+
+    assert cache.get("CIK0000000001") == test_data
+    import sqlite3
+    with sqlite3.connect(db_path) as conn:
+        payload, version = conn.execute("SELECT data, version FROM sec_cache").fetchone()
+    assert isinstance(payload, bytes)
+    assert version > 0
+    assert len(payload) < len(json.dumps(test_data))
+
+
+def test_legacy_uncompressed_rows_remain_readable(tmp_path):
+    import sqlite3
+    import time
+    db_path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE sec_cache (cik TEXT PRIMARY KEY, data TEXT, last_updated REAL)")
+        conn.execute("INSERT INTO sec_cache VALUES (?, ?, ?)", ("CIK0000000001", '{"legacy": true}', time.time()))
+
+    cache = SECCache(db_path=db_path, compression="zlib")
+    assert cache.get("CIK0000000001") == {"legacy": True}
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SECCache(db_path=str(tmp_path / "bad.db"), compression="lz4")
+
+
+def test_cache_reuses_a_wal_connection_per_thread(tmp_path):
+    import threading
+
+    with SECCache(db_path=str(tmp_path / "wal.db")) as cache:
+        conn = cache._connection()
+        assert conn is cache._connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        cache.store("CIK0000000001", {"facts": {}})
+        seen = []
+
+        def reader():
+            seen.append((cache._connection(), cache.get("CIK0000000001")))
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        thread.join()
+
+        assert seen[0][0] is not conn
+        assert seen[0][1] == {"facts": {}}
+        assert len(cache._connections) == 2
+
+    assert cache._connections == []
+    # A closed cache reconnects lazily
+    assert cache.get("CIK0000000001") == {"facts": {}}
+    cache.close()
+
+
+def test_ingest_bulk_archive(tmp_path):
+    import zipfile
+
+    archive_path = tmp_path / "companyfacts.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("CIK0000320193.json", json.dumps({"cik": 320193, "facts": {"us-gaap": {}}}))
+        archive.writestr("CIK0000789019.json", json.dumps({"cik": 789019, "facts": {}}))
+        archive.writestr("CIK0000000003.json", "not json")
+
+    cache = SECCache(db_path=str(tmp_path / "bulk.db"), normalized=True)
+    calls = []
+    stored = cache.ingest_bulk_archive(str(archive_path), batch_size=2, progress=lambda done, total: calls.append((done, total)))
+
+    assert stored == 2
+    assert calls == [(2, 3), (3, 3)]
+    assert cache.get("CIK0000320193") == {"cik": 320193, "facts": {"us-gaap": {}}}
+    assert cache.get("CIK0000789019") == {"cik": 789019, "facts": {}}
+    assert cache.get("CIK0000000003") is None
+    assert cache.get_fact_entries("CIK0000320193", "Assets", "10-K") == []
+    cache.close()
+
+
+def test_request_company_filing_revalidates_with_stub_server(tmp_path):
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from FortyFour.Finance import utils
+
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            seen.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps({"facts": {"version": 1}}).encode()
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Last-Modified", "Wed, 01 Oct 2025 00:00:00 GMT")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cache = SECCache(db_path=str(tmp_path / "revalidate.db"))
+    cik = "CIK0000320193"
+    try:
+        with patch.object(utils, "COMPANY_FACTS_URL", f"http://127.0.0.1:{server.server_port}/{{cik}}.json"):
+            assert utils.request_company_filing(cik, cache=cache) == {"facts": {"version": 1}}
+            assert cache.get_validators(cik) == {"etag": '"v1"', "last_modified": "Wed, 01 Oct 2025 00:00:00 GMT"}
+
+            # Expire the entry: the next call must revalidate and only refresh the timestamp
+            cache._connection().execute("UPDATE sec_cache SET last_updated = 0")
+            cache._connection().commit()
+            assert utils.request_company_filing(cik, cache=cache) == {"facts": {"version": 1}}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert seen == [None, '"v1"']
+    last_updated = cache._connection().execute("SELECT last_updated FROM sec_cache").fetchone()[0]
+    assert time.time() - last_updated < 60
+    cache.close()
+
+
+_SELECTIVE_DOCUMENT = {
+    "cik": 320193,
+    "entityName": "Apple Inc.",
+    "facts": {
+        "dei": {"EntityCommonStockSharesOutstanding": {"units": {"shares": [{"val": 10, "end": "2023-01-01"}]}}},
+        "us-gaap": {
+            "Assets": {"label": "Assets", "units": {"USD": [{"val": 100.5, "end": "2023-01-01", "form": "10-K"}]}},
+            "Liabilities": {"units": {"USD": [{"val": 40, "end": "2023-01-01", "form": "10-K"}]}},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_extract_facts_keeps_only_the_selection(streaming):
+    from FortyFour.Finance import utils
+
+    if streaming:
+        pytest.importorskip("ijson")
+    raw = json.dumps(_SELECTIVE_DOCUMENT).encode()
+    with patch.object(utils, "_import_ijson", wraps=utils._import_ijson if streaming else lambda: None):
+        selected = utils.extract_facts(raw, tags=["Assets"], taxonomies=["us-gaap"])
+        by_taxonomy = utils.extract_facts(raw.decode(), taxonomies=["dei"])
+
+    assert selected == {
+        "cik": 320193,
+        "entityName": "Apple Inc.",
+        "facts": {"us-gaap": {"Assets": _SELECTIVE_DOCUMENT["facts"]["us-gaap"]["Assets"]}},
+    }
+    assert by_taxonomy["facts"] == {"dei": _SELECTIVE_DOCUMENT["facts"]["dei"]}
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_cache_stores_raw_payloads_and_reads_selectively(tmp_path, compression):
+    cache = SECCache(db_path=str(tmp_path / "raw.db"), normalized=True, compression=compression)
+    cik = "CIK0000320193"
+    cache.store(cik, json.dumps(_SELECTIVE_DOCUMENT).encode())
+
+    assert cache.get(cik) == _SELECTIVE_DOCUMENT
+    assert cache.get(cik, tags=["Liabilities"])["facts"] == {
+        "dei": {},
+        "us-gaap": {"Liabilities": _SELECTIVE_DOCUMENT["facts"]["us-gaap"]["Liabilities"]},
+    }
+    assert [entry["val"] for entry in cache.get_fact_entries(cik, "Assets", "10-K")] == [100.5]
+    cache.close()
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_codec_is_recorded_per_row(tmp_path, codec, compression):
+    if codec != "json":
+        pytest.importorskip(codec)
+    db_path = str(tmp_path / "codec.db")
+    cache = SECCache(db_path=db_path, codec=codec, compression=compression)
+    cache.store("CIK0000320193", _SELECTIVE_DOCUMENT)
+    assert cache._connection().execute("SELECT codec FROM sec_cache").fetchone()[0] == codec
+    cache.close()
+
+    # Rows stay readable whatever codec the reading cache is configured with
+    reader = SECCache(db_path=db_path, codec="json", compression=compression)
+    assert reader.get("CIK0000320193") == _SELECTIVE_DOCUMENT
+    assert reader.get("CIK0000320193", tags=["Assets"])["facts"]["us-gaap"] == {
+        "Assets": _SELECTIVE_DOCUMENT["facts"]["us-gaap"]["Assets"]
+    }
+    reader.close()
+
+
+def test_fast_codecs_fall_back_to_json_for_unrepresentable_documents(tmp_path):
+    pytest.importorskip("orjson")
+    cache = SECCache(db_path=str(tmp_path / "fallback.db"), codec="orjson")
+    document = {"facts": {}, "shares": 2 ** 70}
+    cache.store("CIK0000000001", document)
+    assert cache._connection().execute("SELECT codec FROM sec_cache").fetchone()[0] == "json"
+    assert cache.get("CIK0000000001") == document
+    cache.close()
+
+
+def test_unknown_codec_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SECCache(db_path=str(tmp_path / "codec.db"), codec="pickle")
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "bounded.db"), normalized=True, codec="json", max_entries=2)
+    for cik, accessed in (("CIK0000000001", 100), ("CIK0000000002", 300), ("CIK0000000003", 200)):
+        cache.store(cik, _SELECTIVE_DOCUMENT)
+        with cache._connection() as conn:
+            conn.execute("UPDATE sec_cache SET last_accessed = ? WHERE cik = ?", (accessed, cik))
+    cache.store_metric_result("CIK0000000003", "m", "10-K", "f", 1.0, "{}")
+
+    # Reading refreshes the access time, so the oldest entry is now 3, not 2
+    assert cache.get("CIK0000000002") is not None
+    assert cache.get_fact_entries("CIK0000000003", "Assets", "10-K")
+    assert cache.cached_ciks() == {"CIK0000000002", "CIK0000000003"}
+    cache._connection().execute("UPDATE sec_cache SET last_accessed = 0 WHERE cik = 'CIK0000000003'")
+    cache._connection().commit()
+
+    cache.store("CIK0000000004", _SELECTIVE_DOCUMENT)
+    assert cache.cached_ciks() == {"CIK0000000002", "CIK0000000004"}
+    assert cache.get_fact_entries("CIK0000000003", "Assets", "10-K") is None
+    assert cache._connection().execute("SELECT COUNT(*) FROM sec_facts WHERE cik = 'CIK0000000003'").fetchone() == (0,)
+    assert cache.get_metric_result("CIK0000000003", "m", "10-K", "f", 1.0) is None
+    cache.close()
+
+
+def test_cache_evicts_by_size_and_vacuums(tmp_path):
+    document = {"facts": {}, "padding": "x" * 200_000}
+    cache = SECCache(db_path=str(tmp_path / "sized.db"), codec="json")
+    for number in range(1, 6):
+        cache.store(f"CIK{number:010d}", document)
+    conn = cache._connection()
+    assert conn.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+    pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+
+    evicted = cache.evict(max_bytes=450_000)
+    assert sorted(evicted) == ["CIK0000000001", "CIK0000000002", "CIK0000000003"]
+    assert conn.execute("PRAGMA freelist_count").fetchone() == (0,)
+    assert conn.execute("PRAGMA page_count").fetchone()[0] < pages_before
+    # The most recent entry is kept even when it alone exceeds the limit
+    cache.evict(max_bytes=1)
+    assert cache.cached_ciks() == {"CIK0000000005"}
+    cache.close()
+
+
+def test_max_bytes_counts_normalized_facts_and_metric_results(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "accounted.db"), normalized=True, codec="json")
+    cache.store("CIK0000000001", _SELECTIVE_DOCUMENT)
+    cache.store("CIK0000000002", _SELECTIVE_DOCUMENT)
+    conn = cache._connection()
+    payload_bytes = conn.execute("SELECT LENGTH(data) FROM sec_cache WHERE cik = 'CIK0000000001'").fetchone()[0]
+    size_bytes = conn.execute("SELECT size_bytes FROM sec_cache WHERE cik = 'CIK0000000001'").fetchone()[0]
+    assert size_bytes > payload_bytes
+
+    # The payloads alone fit, but not once the older company's metric results are counted
+    cache.store_metric_result("CIK0000000001", "m", "10-K", "f", 1.0, "x" * 10_000)
+    assert cache.evict(max_bytes=2 * size_bytes + 5_000) == ["CIK0000000001"]
+    cache.close()
+
+
+def test_bounded_store_does_not_scan_metric_results(tmp_path):
+    cache = SECCache(db_path=str(tmp_path / "metrics.db"), codec="json", max_bytes=10**9)
+    cache.store("CIK0000000001", _SELECTIVE_DOCUMENT)
+    cache.store_metric_result("CIK0000000001", "m", "10-K", "f", 1.0, "x" * 100)
+    cache.store_metric_result("CIK0000000001", "m", "10-K", "f", 2.0, "é" * 30)
+    cache.store_metric_result("CIK0000000001", "n", "10-K", "f", 1.0, "y" * 50)
+    conn = cache._connection()
+    # Overwritten results are replaced in the running total, multi-byte text counts in bytes
+    assert conn.execute("SELECT metric_bytes FROM sec_cache").fetchone() == (110,)
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    cache.store("CIK0000000001", _SELECTIVE_DOCUMENT)
+    cache.store("CIK0000000002", _SELECTIVE_DOCUMENT)
+    conn.set_trace_callback(None)
+
+    assert statements and not any("metric_cache" in statement for statement in statements)
+    assert conn.execute("SELECT metric_bytes FROM sec_cache WHERE cik = 'CIK0000000001'").fetchone() == (110,)
+    cache.close()
+
+
+def test_vacuum_converts_legacy_databases(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE sec_cache (cik TEXT PRIMARY KEY, data TEXT, last_updated REAL)")
+    conn.commit()
+    conn.close()
+
+    cache = SECCache(db_path=db_path)
+    assert cache._connection().execute("PRAGMA auto_vacuum").fetchone() == (0,)
+    cache.vacuum()
+    assert cache._connection().execute("PRAGMA auto_vacuum").fetchone() == (2,)
+    cache.close()
+
+
+def test_memory_tier_serves_parsed_documents(tmp_path):
+    from FortyFour.Finance import utils
+
+    cache = SECCache(db_path=str(tmp_path / "memory.db"), codec="json", memory_bytes=10_000)
+    cik = "CIK0000320193"
+    cache.store(cik, _SELECTIVE_DOCUMENT)
+
+    first = cache.get(cik)
+    with patch.object(utils, "_decode_document", side_effect=AssertionError("decoded again")):
+        assert cache.get(cik) is first
+        assert cache.get(cik, tags=["Assets"])["facts"]["us-gaap"].keys() == {"Assets"}
+    assert first == _SELECTIVE_DOCUMENT
+    assert cache.memory_stats() == {"hits": 2, "misses": 1, "entries": 1, "bytes": 4 * len(json.dumps(_SELECTIVE_DOCUMENT))}
+
+    # Rewrites and stale flags are honoured even though the parsed copy is still in memory
+    updated = {**_SELECTIVE_DOCUMENT, "entityName": "Apple"}
+    cache.store(cik, updated)
+    assert cache.get(cik) == updated
+    cache.mark_stale([cik])
+    assert cache.get(cik) is None
+    assert cache.memory_stats()["entries"] == 0
+    cache.close()
+
+
+def test_memory_tier_is_bounded_by_bytes(tmp_path):
+    document = {"facts": {}, "padding": "x" * 100}
+    # Entries are charged their estimated parsed size, four times the JSON payload
+    size = 4 * len(json.dumps(document))
+    cache = SECCache(db_path=str(tmp_path / "memory.db"), codec="json", memory_bytes=2 * size)
+    for number in range(1, 4):
+        cache.store(f"CIK{number:010d}", document)
+        cache.get(f"CIK{number:010d}")
+    cache.get("CIK0000000002")
+
+    assert cache.memory_stats() == {"hits": 1, "misses": 3, "entries": 2, "bytes": 2 * size}
+    assert set(cache._memory._entries) == {"CIK0000000002", "CIK0000000003"}
+    cache.close()
+
+
+_TICKERS_EXCHANGE = {
+    "fields": ["cik", "name", "ticker", "exchange"],
+    "data": [
+        [320193, "Apple Inc.", "AAPL", "Nasdaq"],
+        [1067983, "BERKSHIRE HATHAWAY INC", "BRK-B", "NYSE"],
+        [1067983, "BERKSHIRE HATHAWAY INC", "BRK-A", "NYSE"],
+        [789019, "MICROSOFT CORP", "MSFT", "Nasdaq"],
+        [1652044, "Alphabet Inc.", "GOOGL", "Nasdaq"],
+    ],
+}
+
+
+def test_ticker_lookup_table(tmp_path):
+    from FortyFour.Finance.utils import parse_company_tickers
+
+    cache = SECCache(db_path=str(tmp_path / "tickers.db"))
+    assert not cache.tickers_fresh()
+    assert cache.store_tickers(parse_company_tickers(_TICKERS_EXCHANGE)) == 5
+    assert cache.tickers_fresh()
+
+    assert cache.lookup_ticker("brk.b") == {
+        "ticker": "BRK-B", "cik": "CIK0001067983", "name": "BERKSHIRE HATHAWAY INC", "exchange": "NYSE",
+    }
+    assert cache.lookup_ticker("ZZZZ") is None
+    assert [r["ticker"] for r in cache.search_companies("berkshire")] == ["BRK-A", "BRK-B"]
+    assert [r["ticker"] for r in cache.search_companies("msft")] == ["MSFT"]
+    assert [r["ticker"] for r in cache.search_companies("Microsfot Corp")] == ["MSFT"]
+    assert [r["ticker"] for r in cache.search_companies("a", limit=1)] == ["GOOGL"]
+    assert cache.search_companies("!!") == []
+    cache.close()
+
+
+def test_parse_plain_company_tickers():
+    from FortyFour.Finance.utils import parse_company_tickers
+
+    plain = {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}}
+    assert parse_company_tickers(plain) == [
+        {"ticker": "AAPL", "cik": "CIK0000320193", "name": "Apple Inc.", "exchange": None}
+    ]
+
+
+def test_resolve_ticker_persists_the_ticker_list(tmp_path):
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from FortyFour.Finance import utils
+
+    downloads = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            downloads.append(self.path)
+            body = json.dumps(_TICKERS_EXCHANGE).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    db_path = str(tmp_path / "tickers.db")
+    try:
+        with patch.object(utils, "COMPANY_TICKERS_URL", f"http://127.0.0.1:{server.server_port}/tickers.json"):
+            cache = SECCache(db_path=db_path)
+            assert utils.resolve_ticker("AAPL", cache=cache)["cik"] == "CIK0000320193"
+            cache.close()
+            # A new process reuses the persisted table instead of downloading again
+            cache = SECCache(db_path=db_path)
+            assert utils.resolve_ticker("msft", cache=cache)["name"] == "MICROSOFT CORP"
+            assert utils.resolve_ticker("NOPE", cache=cache) is None
+            assert utils.refresh_tickers(cache, force=True) == 5
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert downloads == ["/tickers.json", "/tickers.json"]
+    cache.close()
+
+
+def test_get_all_cik_reads_the_persisted_ticker_table(tmp_path):
+    from unittest.mock import Mock
+
+    from FortyFour.Finance import utils
+
+    response = Mock(status_code=200, content=json.dumps(_TICKERS_EXCHANGE).encode())
+    response.json.return_value = _TICKERS_EXCHANGE
+    cache = SECCache(db_path=str(tmp_path / "all_cik.db"))
+    with patch("requests.get", return_value=response) as get:
+        first = utils.get_all_cik(cache)
+        second = utils.get_all_cik(cache)
+
+    assert get.call_count == 1
+    assert get.call_args.args[0] == utils.COMPANY_TICKERS_URL
+    assert list(first.columns) == ["cik", "ticker", "NAME", "exchange"]
+    assert list(first["ticker"]) == ["AAPL", "BRK-B", "BRK-A", "MSFT", "GOOGL"]
+    assert first.loc[0, "cik"] == "CIK0000320193"
+    assert second.equals(first)
+    # The ticker lookup and the full list come from the same table
+    assert utils.resolve_ticker("MSFT", cache=cache)["cik"] == first.loc[3, "cik"]
+
+    with patch("requests.get", side_effect=ConnectionError("offline")):
+        assert utils.get_all_cik(SECCache(db_path=str(tmp_path / "empty.db"))).empty
+    cache.close()
+
+
+def test_resolve_ticker_falls_back_to_the_stored_list_when_offline(tmp_path):
+    import requests
+    from FortyFour.Finance import Company, utils
+
+    cache = SECCache(db_path=str(tmp_path / "offline.db"))
+    cache.store_tickers(utils.parse_company_tickers(_TICKERS_EXCHANGE))
+    cache._connection().execute("UPDATE sec_tickers SET updated_at = 0")
+    cache._connection().commit()
+
+    offline = requests.ConnectionError("offline")
+    with patch("requests.get", side_effect=offline) as get:
+        assert utils.resolve_ticker("AAPL", cache=cache)["cik"] == "CIK0000320193"
+        assert Company.from_ticker("MSFT", cache=cache).name == "MICROSOFT CORP"
+        assert get.called
+        empty = SECCache(db_path=str(tmp_path / "empty.db"))
+        assert utils.resolve_ticker("AAPL", cache=empty) is None
+        utils._company_tickers_by_symbol.cache_clear()
+        assert utils.resolve_ticker("AAPL") is None
+    empty.close()
+    cache.close()
@@ -0,0 +1,57 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from FortyFour.Finance.utils import render_sparkline, render_sparklines
+
+
+def _points(svg, element="polyline"):
+    match = re.search(rf'<{element} points="([^"]+)"', svg)
+    return [tuple(map(float, point.split(","))) for point in match.group(1).split()]
+
+
+def test_svg_sparklines_scale_values_into_the_box():
+    rendered = render_sparklines([np.array([1.0, 2.0, np.nan, 3.0]), [5, 5, 5]], width=100, height=50, stroke_width=2)
+    svg, flat = rendered[0], rendered[1]
+
+    assert svg.startswith('<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50"')
+    # NaNs are skipped; the minimum sits at the bottom and the maximum at the top
+    assert _points(svg) == [(2.0, 48.0), (50.0, 25.0), (98.0, 2.0)]
+    assert _points(svg, "polygon")[0] == (2.0, 50.0)
+    assert [y for _, y in _points(flat)] == [25.0, 25.0, 25.0]
+
+
+def test_svg_sparklines_keep_the_shape_of_the_input():
+    panel = pd.DataFrame({"CIK1": [1.0, 2.0], "CIK2": [None, 4.0]})
+
+    rendered = render_sparklines(panel, fill=False, color='"red"')
+
+    assert list(rendered) == ["CIK1", "CIK2"]
+    assert "<polygon" not in rendered["CIK1"]
+    assert 'stroke="&quot;red&quot;"' in rendered["CIK1"]
+    assert "<polyline" not in rendered["CIK2"]
+    assert list(render_sparklines(np.ones((3, 4)))) == [0, 1, 2]
+
+
+def test_a_single_series_renders_one_sparkline():
+    expected = render_sparklines([[1.0, 2.0, 3.0]])[0]
+
+    assert render_sparkline(pd.Series([1.0, 2.0, 3.0])) == expected
+    assert render_sparkline(np.array([1.0, 2.0, 3.0])) == expected
+    assert render_sparkline([1, 2.0, None, 3]) == expected
+    assert render_sparklines([]) == {}
+    # The batch renderer always returns a dict and rejects a lone series instead of guessing
+    for single in (pd.Series([1.0, 2.0]), np.array([1.0, 2.0]), [1.0, 2.0]):
+        with pytest.raises(TypeError):
+            render_sparklines(single)
+
+
+def test_plotly_backend_returns_html_fragments():
+    fragments = render_sparklines({"AAPL": [1, 3, 2]}, backend="plotly")
+
+    assert fragments["AAPL"].startswith("<div")
+    assert "<html" not in fragments["AAPL"]
+    with pytest.raises(ValueError):
+        render_sparklines([[1, 2]], backend="matplotlib")